@@ -0,0 +1,242 @@
+"""Processamento em lote de payloads do WhatsApp a partir de um arquivo JSONL.
+
+Lê o arquivo em streaming e processa cada payload com ``AgentRunner.chat_single``,
+sem passar pelo RabbitMQ. Mensagens da mesma conversa são processadas em
+ordem; conversas diferentes, em paralelo. Cada resultado é uma linha do
+arquivo de saída, que também serve de checkpoint: rodar de novo com a mesma
+saída retoma de onde parou, refazendo só as linhas que faltaram ou falharam.
+
+Quando uma linha falha, as seguintes da mesma conversa não são processadas
+(ficam registradas com ``blocked_by``): responder a elas sem a anterior no
+histórico embaralharia a conversa. Na retomada a conversa recomeça da linha
+que falhou; uma falha seguida de sucesso na mesma conversa (saídas antigas)
+não é refeita.
+
+Uso:
+    python batch_runner.py payloads.jsonl --output respostas.jsonl --concurrency 8
+"""
+
+import json
+import time
+import logging
+import argparse
+import threading
+from typing import Dict, Iterator, Set, Tuple
+
+from dotenv import load_dotenv
+
+from ia_hub.agents.agent_factory import agent_factory
+from ia_hub.agents.agent_runner import AgentRunner
+from ia_hub.agents.envelope import MessageEnvelope, dumps, loads
+from ia_hub.scheduling import FairScheduler, ScheduledMessage
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def load_completed(output_path: str) -> Set[int]:
+    """Retorna as linhas da entrada que não devem ser refeitas.
+
+    São as processadas com sucesso e as que falharam numa conversa que já
+    teve uma linha posterior bem-sucedida: refazê-las agora gravaria a
+    resposta fora de ordem no histórico.
+    """
+    completed = set()
+    failed: Dict[int, str] = {}
+    last_success: Dict[str, int] = {}
+    try:
+        with open(output_path, "rb") as handle:
+            for line in handle:
+                try:
+                    record = loads(line)
+                except json.JSONDecodeError:
+                    # Última linha truncada por uma interrupção.
+                    continue
+                if "error" in record:
+                    if record.get("thread_id"):
+                        failed[record["line"]] = record["thread_id"]
+                elif "blocked_by" not in record:
+                    completed.add(record["line"])
+                    thread_id = record.get("thread_id")
+                    if thread_id:
+                        last_success[thread_id] = max(
+                            last_success.get(thread_id, 0), record["line"]
+                        )
+    except FileNotFoundError:
+        pass
+
+    for number, thread_id in failed.items():
+        if number not in completed and last_success.get(thread_id, 0) > number:
+            logger.warning(
+                "Linha %d falhou, mas a conversa %s seguiu; não será refeita.",
+                number,
+                thread_id,
+            )
+            completed.add(number)
+    return completed
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as handle:
+        handle.seek(-1, 2)
+        return handle.read(1) == b"\n"
+
+
+def iter_payloads(input_path: str) -> Iterator[Tuple[int, bytes]]:
+    """Itera (número da linha, conteúdo) sem carregar o arquivo inteiro."""
+    with open(input_path, "rb") as handle:
+        for number, line in enumerate(handle, start=1):
+            if line.strip():
+                yield number, line
+
+
+class BatchRunner:
+    """Processa um JSONL de payloads gravando um JSONL de respostas."""
+
+    def __init__(self, output_path: str, concurrency: int = 4, max_pending: int = 256):
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._write_lock = threading.Lock()
+        self._output = None
+        # thread_id -> primeira linha que falhou nesta execução.
+        self._failed_threads: Dict[str, int] = {}
+        self.processed = 0
+        self.failed = 0
+        self.blocked = 0
+
+    def _handle(self, message: ScheduledMessage) -> None:
+        number, envelope = message.payload
+        record = {
+            "line": number,
+            "thread_id": envelope.thread_id,
+            "message_id": envelope.message_id,
+        }
+        # Mensagens da mesma conversa chegam aqui em ordem, uma de cada vez.
+        failed_line = self._failed_threads.get(envelope.thread_id)
+        if failed_line is not None:
+            record["blocked_by"] = failed_line
+            self._write(record)
+            return
+
+        started = time.perf_counter()
+        try:
+            runner = AgentRunner(
+                thread_id=envelope.thread_id, owner_id=envelope.owner_id
+            )
+            responses = runner.chat_single(envelope)
+            messages = responses.get("messages")
+            # Mensagens descartadas no pré-processamento não têm resposta.
+            record["reply"] = envelope.reply(messages[-1].content) if messages else None
+        except Exception as e:
+            logger.exception("Erro ao processar a linha %d", number)
+            record["error"] = repr(e)
+            self._failed_threads[envelope.thread_id] = number
+        record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self._write(record)
+
+    def _write(self, record: dict) -> None:
+        with self._write_lock:
+            self._output.write(dumps(record) + b"\n")
+            self._output.flush()
+            if "error" in record:
+                self.failed += 1
+            elif "blocked_by" in record:
+                self.blocked += 1
+            else:
+                self.processed += 1
+
+    def run(self, input_path: str) -> dict:
+        """Processa o arquivo de entrada e retorna as estatísticas da execução."""
+        completed = load_completed(self.output_path)
+        if completed:
+            logger.info("Retomando: %d linha(s) já processada(s).", len(completed))
+
+        scheduler = FairScheduler(
+            handler=self._handle,
+            on_done=lambda message, ok: self._pending.release(),
+            workers=self.concurrency,
+            max_in_flight_per_owner=self.concurrency,
+        )
+
+        started = time.perf_counter()
+        skipped = invalid = 0
+        with open(self.output_path, "ab") as self._output:
+            if self._output.tell() and not _ends_with_newline(self.output_path):
+                # Separa a linha truncada por uma interrupção anterior.
+                self._output.write(b"\n")
+            scheduler.start()
+            for number, line in iter_payloads(input_path):
+                if number in completed:
+                    skipped += 1
+                    continue
+                try:
+                    envelope = MessageEnvelope.parse(line)
+                except ValueError as e:
+                    self._write({"line": number, "error": repr(e)})
+                    invalid += 1
+                    continue
+
+                # Limita as mensagens em memória enquanto os workers trabalham.
+                self._pending.acquire()
+                scheduler.submit(
+                    ScheduledMessage(
+                        owner_id=str(envelope.owner_id),
+                        thread_id=envelope.thread_id,
+                        payload=(number, envelope),
+                    )
+                )
+
+            while scheduler.queued or scheduler.in_flight:
+                time.sleep(0.05)
+            scheduler.stop()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "processed": self.processed,
+            "failed": self.failed - invalid,
+            "blocked": self.blocked,
+            "invalid": invalid,
+            "skipped": skipped,
+            "elapsed_s": round(elapsed, 3),
+            "messages_per_s": round(self.processed / elapsed, 2) if elapsed else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="Arquivo JSONL com payloads do WhatsApp.")
+    parser.add_argument(
+        "--output", required=True, help="Arquivo JSONL de respostas (e checkpoint)."
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=256,
+        help="Mensagens lidas e ainda não processadas mantidas em memória.",
+    )
+    args = parser.parse_args()
+
+    agent_factory.warm_up()
+    try:
+        stats = BatchRunner(args.output, args.concurrency, args.max_pending).run(
+            args.input
+        )
+    finally:
+        agent_factory.close()
+
+    logger.info(
+        "Concluído: %(processed)d processada(s), %(failed)d com erro, "
+        "%(blocked)d aguardando conversa com erro, %(invalid)d inválida(s), %(skipped)d já feita(s) em %(elapsed_s)ss "
+        "(%(messages_per_s)s msgs/s).",
+        stats,
+    )
+
+
+if __name__ == "__main__":
+    main()
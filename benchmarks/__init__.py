@@ -0,0 +1 @@
+"""Benchmarks offline do pipeline de mensagens."""
@@ -0,0 +1,139 @@
+"""Compara os serializadores de checkpoint em conversas longas.
+
+Simula o que o PostgresSaver grava por conversa: a cada turno uma nova
+versão do canal ``messages`` (a lista inteira) vai para ``checkpoint_blobs``.
+Mede, para 10, 100 e 1000 turnos, a latência de escrita e leitura do último
+checkpoint e o tamanho armazenado por thread.
+
+Os tempos são só das chamadas do serializador (``dumps_typed`` e
+``loads_typed``), sem o Postgres: não incluem a ida ao banco de
+``PostgresSaver.put``/``get_tuple``, onde o blob menor também reduz o I/O.
+Os tamanhos valem para o que é gravado em ``checkpoint_blobs``.
+
+Uso:
+    python -m benchmarks.checkpoint_serde
+    python -m benchmarks.checkpoint_serde --turns 10,100 --output serde.json
+"""
+
+import json
+import time
+import argparse
+import statistics
+from typing import Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ia_hub.agents.checkpoint_serializer import CompressedSerializer, zstandard
+
+from .payloads import SAMPLE_MESSAGES
+
+TOOL_RESULT = (
+    '{"quartos":[{"titulo":"Apartamento de teste","disponivel":true,'
+    '"total_brl":1234.0,"diaria_brl":617.0}]}'
+)
+
+
+def turn_messages(turn: int) -> List:
+    """Mensagens de um turno; a cada três, o agente consulta uma ferramenta."""
+    text = SAMPLE_MESSAGES[turn % len(SAMPLE_MESSAGES)]
+    messages = [HumanMessage(content=text, id=f"h{turn}")]
+    if turn % 3 == 0:
+        call_id = f"call_{turn}"
+        messages.append(
+            AIMessage(
+                content="",
+                id=f"c{turn}",
+                tool_calls=[
+                    {
+                        "name": "retrieve_availability_and_prices",
+                        "args": {"check_in": "2030-01-10", "check_out": "2030-01-12"},
+                        "id": call_id,
+                    }
+                ],
+            )
+        )
+        messages.append(
+            ToolMessage(
+                content=TOOL_RESULT,
+                name="retrieve_availability_and_prices",
+                tool_call_id=call_id,
+                id=f"t{turn}",
+            )
+        )
+    messages.append(
+        AIMessage(
+            content=f"Claro! Sobre '{text}': o apartamento está disponível e o "
+            "valor total para as datas é R$ 1.234,00, sem taxas de limpeza.",
+            id=f"a{turn}",
+            response_metadata={"model_name": "gpt-4.1-mini", "finish_reason": "stop"},
+        )
+    )
+    return messages
+
+
+def measure(name: str, serde, turns: int, reads: int = 20) -> Dict:
+    """Grava um checkpoint por turno e lê o último ``reads`` vezes."""
+    messages: List = []
+    writes: List[float] = []
+    stored = 0
+    data = None
+    for turn in range(turns):
+        messages.extend(turn_messages(turn))
+        started = time.perf_counter()
+        data = serde.dumps_typed(messages)
+        writes.append(time.perf_counter() - started)
+        stored += len(data[1])
+
+    read_times = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        serde.loads_typed(data)
+        read_times.append(time.perf_counter() - started)
+
+    return {
+        # Tempos só do serializador, sem a ida ao Postgres.
+        "scope": "serializer_only",
+        "serializer": name,
+        "turns": turns,
+        "messages": len(messages),
+        "write_ms_last": round(writes[-1] * 1000, 3),
+        "write_ms_median": round(statistics.median(writes) * 1000, 3),
+        "read_ms_median": round(statistics.median(read_times) * 1000, 3),
+        "checkpoint_kb": round(len(data[1]) / 1024, 1),
+        "thread_kb": round(stored / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", default="10,100,1000")
+    parser.add_argument("--output", help="Grava os resultados em JSON.")
+    args = parser.parse_args()
+
+    serializers = {
+        "jsonplus": JsonPlusSerializer(),
+        "jsonplus+zlib": CompressedSerializer(compression="zlib"),
+    }
+    if zstandard is not None:
+        serializers["jsonplus+zstd"] = CompressedSerializer(compression="zstd")
+
+    print("Tempos só do serializador (sem PostgresSaver.put/get_tuple no banco).")
+    results = []
+    for turns in [int(value) for value in args.turns.split(",")]:
+        for name, serde in serializers.items():
+            result = measure(name, serde, turns)
+            results.append(result)
+            print(
+                "turnos={turns:<5} serializador={serializer:<14} "
+                "escrita(serde)={write_ms_last}ms leitura(serde)={read_ms_median}ms "
+                "checkpoint={checkpoint_kb}KB thread={thread_kb}KB".format(**result)
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Substitutos determinísticos para LLM, broker, navegador e banco.
+
+Permitem executar o pipeline real (consumer → agente → ferramentas →
+publicação) sem OpenAI, RabbitMQ, Chrome ou Postgres.
+"""
+
+import math
+import time
+import zlib
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import InMemorySaver
+
+from ia_hub.agents.envelope import dumps
+
+AVAILABILITY_KEYWORDS = ("disponível", "disponibilidade", "preço", "valor", "diária")
+KNOWLEDGE_KEYWORDS = ("wifi", "wi-fi", "senha", "check-in", "estacionamento", "pet")
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model determinístico que imita as decisões do agente ReAct.
+
+    Pede a ferramenta de disponibilidade ou de conhecimento conforme
+    palavras-chave da última mensagem do usuário e responde com texto fixo
+    quando já recebeu o resultado da ferramenta.
+    """
+
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_message(self, messages) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return AIMessage(content=f"Segundo a consulta: {str(last.content)[:120]}")
+
+        text = str(last.content).lower() if isinstance(last, HumanMessage) else ""
+        call_id = f"call_{zlib.crc32(f'{len(messages)}:{text}'.encode())}"
+        if any(keyword in text for keyword in AVAILABILITY_KEYWORDS):
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "retrieve_availability_and_prices",
+                        "args": {
+                            "check_in": "2030-01-10",
+                            "check_out": "2030-01-12",
+                            "guests": 2,
+                            "adults": 2,
+                        },
+                        "id": call_id,
+                    }
+                ],
+            )
+        if any(keyword in text for keyword in KNOWLEDGE_KEYWORDS):
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "look_for_information_that_i_don_t_know",
+                        "args": {"raw_input": text},
+                        "id": call_id,
+                    }
+                ],
+            )
+        return AIMessage(content=f"Resposta automática para: {text[:80]}")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+
+        message = self._next_message(messages)
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": len(str(message.content)) // 4,
+            "total_tokens": input_tokens + len(str(message.content)) // 4,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeVectorStore:
+    """Vector store em memória compatível com o uso de PGVector nas ferramentas."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self._documents: List[Document] = []
+        self._vectors: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def add_texts(self, texts, metadatas=None):
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = self.embeddings.embed_documents(list(texts))
+        with self._lock:
+            for text, metadata, vector in zip(texts, metadatas, vectors):
+                self._documents.append(Document(page_content=text, metadata=metadata))
+                self._vectors.append(vector)
+
+    def similarity_search(self, query, k=4, filter: Optional[Dict[str, Any]] = None):
+        query_vector = self.embeddings.embed_query(query)
+        with self._lock:
+            candidates = [
+                (document, vector)
+                for document, vector in zip(self._documents, self._vectors)
+                if not filter
+                or all(
+                    document.metadata.get(key) == value for key, value in filter.items()
+                )
+            ]
+
+        def score(vector):
+            dot = sum(a * b for a, b in zip(query_vector, vector))
+            norm = math.sqrt(sum(a * a for a in vector)) or 1.0
+            return dot / norm
+
+        candidates.sort(key=lambda item: score(item[1]), reverse=True)
+        return [document for document, _ in candidates[:k]]
+
+
+class InMemoryBroker:
+    """Broker em memória com a mesma interface do RabbitMQPublisher."""
+
+    def __init__(self):
+        self.published: deque = deque()
+        self.bytes_published = 0
+        self._lock = threading.Lock()
+
+    def publish(self, message: dict) -> None:
+        body = dumps(message)
+        with self._lock:
+            self.published.append(body)
+            self.bytes_published += len(body)
+
+
+class FakeChannel:
+    """Canal que só registra os acks feitos pelo callback do consumer."""
+
+    def __init__(self):
+        self.acked: List[int] = []
+        self.nacked: List[int] = []
+
+    def basic_ack(self, delivery_tag):
+        self.acked.append(delivery_tag)
+
+    def basic_nack(self, delivery_tag, requeue=True):
+        self.nacked.append(delivery_tag)
+
+
+class FakeScraper:
+    """Substitui scrape_rooms com latência configurável."""
+
+    def __init__(self, latency: float = 0.5):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return [
+            {
+                "room_id": "1",
+                "titulo": "Apartamento de teste",
+                "preco_total": "R$ 1.234,00",
+                "diaria": "R$ 617,00",
+                "disponivel": True,
+                "mensagem_indisponivel": None,
+            }
+        ]
+
+
+class InMemoryCheckpointer(InMemorySaver):
+    """InMemorySaver com a interface usada pelo AgentFactory (setup e context manager)."""
+
+    def setup(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def install_fakes(
+    llm_latency: float = 0.0,
+    scraper_latency: float = 0.5,
+    knowledge: Optional[Dict[str, List[str]]] = None,
+):
+    """Substitui as dependências externas do pipeline pelos fakes.
+
+    Returns:
+        dict com os fakes instalados (broker, scraper, checkpointer, ...).
+    """
+    from ia_hub.agents import tools
+    from ia_hub.agents.checkpoint_serializer import checkpoint_serializer
+    from ia_hub.agents.agent_factory import agent_factory
+
+    model = FakeChatModel(latency=llm_latency)
+    embeddings = DeterministicFakeEmbedding(size=256)
+    vector_store = FakeVectorStore(embeddings)
+    for owner_id, documents in (knowledge or {}).items():
+        vector_store.add_texts(documents, [{"owner_id": owner_id} for _ in documents])
+
+    checkpointer = InMemoryCheckpointer(serde=checkpoint_serializer)
+    scraper = FakeScraper(latency=scraper_latency)
+    broker = InMemoryBroker()
+
+    # Descarta o grafo de uma rodada anterior, montado com outros fakes.
+    agent_factory.close()
+    agent_factory.get_model = lambda *args, **kwargs: model
+    agent_factory.get_checkpointer = lambda: checkpointer
+    agent_factory.get_pooled_checkpointer = lambda: checkpointer
+    tools.scrape_rooms = scraper
+    tools.warm_up_scraper = lambda: None
+    tools.get_vector_store = lambda: vector_store
+
+    return {
+        "model": model,
+        "embeddings": embeddings,
+        "vector_store": vector_store,
+        "checkpointer": checkpointer,
+        "scraper": scraper,
+        "broker": broker,
+    }
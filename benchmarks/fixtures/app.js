@@ -0,0 +1,7 @@
+// Simula a renderização do preço pelo cliente, depois dos dados da API.
+setTimeout(function () {
+  var price = document.createElement("div");
+  price.setAttribute("data-testid", "book-it-total-price");
+  price.textContent = "R$ 1.250,00";
+  document.getElementById("book-it").appendChild(price);
+}, 200);
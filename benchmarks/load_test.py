@@ -0,0 +1,169 @@
+"""Teste de carga offline do pipeline de mensagens.
+
+Reproduz payloads de webhook do WhatsApp pelo callback real do consumer,
+com LLM, embeddings, broker, scraper e checkpointer substituídos por fakes
+determinísticos, e mede vazão, latência e memória por conversa conforme a
+concorrência aumenta.
+
+Uso:
+    python -m benchmarks.load_test --conversations 40 --turns 4 --concurrency 1,4,8
+    python -m benchmarks.load_test --payloads replay.jsonl --scraper-latency 2
+"""
+
+import io
+import json
+import time
+import logging
+import argparse
+import itertools
+import tracemalloc
+import contextlib
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import pika
+
+from ia_hub.agents.tool_outputs import DEFAULT_TOOL_TOKEN_BUDGETS, TOOL_TOKENS_SAVED
+
+from .fakes import FakeChannel, install_fakes
+from .payloads import generate_conversations, load_conversations
+
+KNOWLEDGE = {
+    f"55110000{index:04d}": [
+        "A senha do wifi é praia2024.",
+        "O check-in é a partir das 14h e o check-out até as 11h.",
+        "Há uma vaga de estacionamento coberta.",
+        "Aceitamos pets de pequeno porte.",
+    ]
+    for index in range(5)
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por interpolação linear (valores em qualquer ordem)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def tool_tokens_saved() -> float:
+    """Total de tokens economizados pelas saídas compactas até agora."""
+    return sum(
+        TOOL_TOKENS_SAVED.value(tool=name) for name in DEFAULT_TOOL_TOKEN_BUDGETS
+    )
+
+
+def run_level(
+    consumer, conversations: List[List[Dict]], concurrency: int, fakes: Dict
+) -> Dict:
+    """Processa todas as conversas com N workers e devolve as métricas."""
+    channel = FakeChannel()
+    latencies: List[float] = []
+    errors: List[int] = []
+    delivery_tags = itertools.count(1)
+
+    def run_conversation(payloads):
+        for payload in payloads:
+            value = payload["entry"][0]["changes"][0]["value"]
+            method = SimpleNamespace(delivery_tag=next(delivery_tags))
+            properties = pika.BasicProperties(
+                headers={"message_id": value["messages"][0]["id"]},
+                timestamp=int(time.time()),
+            )
+            body = json.dumps(payload).encode("utf-8")
+            started = time.perf_counter()
+            try:
+                consumer.callback(channel, method, properties, body)
+            except Exception:
+                errors.append(method.delivery_tag)
+            latencies.append(time.perf_counter() - started)
+
+    saved_before = tool_tokens_saved()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    # Cada conversa é processada em ordem por um único worker, como no consumer real.
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run_conversation, conversations))
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    messages = sum(len(payloads) for payloads in conversations)
+    return {
+        "concurrency": concurrency,
+        "messages": messages,
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_s": round(messages / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "retained_kb_per_conversation": round(
+            (current - baseline) / 1024 / max(len(conversations), 1), 1
+        ),
+        "peak_kb": round(peak / 1024, 1),
+        "published_bytes": fakes["broker"].bytes_published,
+        "scraper_calls": fakes["scraper"].calls,
+        "tool_tokens_saved": int(tool_tokens_saved() - saved_before),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payloads", help="Arquivo JSONL com payloads do WhatsApp.")
+    parser.add_argument("--conversations", type=int, default=40)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--scraper-latency", type=float, default=0.5)
+    parser.add_argument("--output", help="Grava os resultados em JSON.")
+    args = parser.parse_args()
+
+    import consumer
+    from ia_hub.agents import agent_service
+    from ia_hub.agents.agent_factory import agent_factory
+    from ia_hub.agents.dedup import MessageDeduplicator
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = []
+    for level in [int(value) for value in args.concurrency.split(",")]:
+        # Fakes novos por nível: cada rodada começa com checkpoints vazios.
+        fakes = install_fakes(
+            llm_latency=args.llm_latency,
+            scraper_latency=args.scraper_latency,
+            knowledge=KNOWLEDGE,
+        )
+        consumer.publisher = fakes["broker"]
+        agent_factory.warm_up()
+        # Os payloads se repetem entre os níveis; sem isso seriam duplicados.
+        agent_service.message_deduplicator = MessageDeduplicator()
+        conversations = (
+            load_conversations(args.payloads)
+            if args.payloads
+            else generate_conversations(args.conversations, args.turns)
+        )
+        result = run_level(consumer, conversations, level, fakes)
+        results.append(result)
+        print(
+            "concorrência={concurrency:<3} msgs={messages:<5} erros={errors:<3} "
+            "msgs/s={messages_per_s:<8} p50={p50_ms}ms p95={p95_ms}ms "
+            "p99={p99_ms}ms memória/conversa={retained_kb_per_conversation}KB".format(
+                **result
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Geração e leitura de payloads de webhook do WhatsApp para os benchmarks."""
+
+import json
+import random
+from typing import Dict, Iterator, List
+
+SAMPLE_MESSAGES = [
+    "Oi, tudo bem?",
+    "O apartamento está disponível no fim de semana?",
+    "Qual a senha do wifi?",
+    "Qual o valor da diária para duas pessoas?",
+    "Tem estacionamento no prédio?",
+    "Que horas posso fazer o check-in?",
+    "Obrigado!",
+    "Aceita pet?",
+]
+
+
+def make_payload(
+    display_phone_number: str, wa_id: str, text: str, message_id: str
+) -> Dict:
+    """Monta um payload no formato do webhook da WhatsApp Business API."""
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": "0",
+                "changes": [
+                    {
+                        "field": "messages",
+                        "value": {
+                            "messaging_product": "whatsapp",
+                            "metadata": {
+                                "display_phone_number": display_phone_number,
+                                "phone_number_id": f"pnid-{display_phone_number}",
+                            },
+                            "contacts": [
+                                {
+                                    "profile": {"name": f"Hóspede {wa_id}"},
+                                    "wa_id": wa_id,
+                                }
+                            ],
+                            "messages": [
+                                {
+                                    "from": wa_id,
+                                    "id": message_id,
+                                    "timestamp": "0",
+                                    "type": "text",
+                                    "text": {"body": text},
+                                }
+                            ],
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def thread_id_of(payload: Dict) -> str:
+    """Retorna o thread_id (display_phone_number.wa_id) de um payload."""
+    value = payload["entry"][0]["changes"][0]["value"]
+    return (
+        f"{value['metadata']['display_phone_number']}.{value['contacts'][0]['wa_id']}"
+    )
+
+
+def generate_conversations(
+    conversations: int, turns: int, owners: int = 5, seed: int = 42
+) -> List[List[Dict]]:
+    """Gera conversas sintéticas, cada uma como lista ordenada de payloads."""
+    rng = random.Random(seed)
+    result = []
+    for index in range(conversations):
+        owner = f"55110000{index % owners:04d}"
+        wa_id = f"55219{index:07d}"
+        result.append(
+            [
+                make_payload(
+                    owner, wa_id, rng.choice(SAMPLE_MESSAGES), f"wamid.{index}.{turn}"
+                )
+                for turn in range(turns)
+            ]
+        )
+    return result
+
+
+def load_conversations(path: str) -> List[List[Dict]]:
+    """Lê payloads de um arquivo JSONL e agrupa por conversa, mantendo a ordem."""
+    grouped: Dict[str, List[Dict]] = {}
+    for payload in iter_jsonl(path):
+        grouped.setdefault(thread_id_of(payload), []).append(payload)
+    return list(grouped.values())
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """Itera sobre os objetos de um arquivo JSONL ignorando linhas vazias."""
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
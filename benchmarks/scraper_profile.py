@@ -0,0 +1,148 @@
+"""Compara os perfis de renderização do scraper com páginas locais.
+
+Serve uma página de anúncio de exemplo (``fixtures/listing.html``) com
+imagens, fontes, vídeo, mapa e rastreadores de terceiros gerados localmente,
+com latência artificial, e mede para cada perfil o tempo até o preço estar
+na página e os bytes servidos. Precisa do Chrome e do chromedriver.
+
+Uso:
+    python -m benchmarks.scraper_profile --runs 5
+    python -m benchmarks.scraper_profile --profiles full,lean --output perfil.json
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+import statistics
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Recursos gerados: (content-type, tamanho em bytes, latência em segundos)
+GENERATED = {
+    "/im/pictures/": ("image/jpeg", 250_000, 0.15),
+    "/static/cereal.woff2": ("font/woff2", 90_000, 0.1),
+    "/static/tour.mp4": ("video/mp4", 2_000_000, 0.3),
+    "/3p/": ("application/javascript", 60_000, 0.8),
+}
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Serve os fixtures e gera os recursos pesados, contando os bytes."""
+
+    counter_lock = threading.Lock()
+    bytes_served = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=FIXTURES_DIR, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+    @classmethod
+    def count(cls, size: int) -> None:
+        with cls.counter_lock:
+            cls.bytes_served += size
+
+    def do_GET(self):
+        for prefix, (content_type, size, latency) in GENERATED.items():
+            if self.path.startswith(prefix):
+                time.sleep(latency)
+                body = (
+                    b"/* fixture */\n" * (size // 14)
+                    if content_type.endswith("javascript")
+                    else os.urandom(size)
+                )
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                self.count(len(body))
+                return
+
+        path = self.translate_path(self.path)
+        if os.path.isfile(path):
+            self.count(os.path.getsize(path))
+        super().do_GET()
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(profile: str, url: str, runs: int) -> Dict:
+    """Abre a página ``runs`` vezes com o perfil e mede tempo e bytes."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    from ia_hub.airbnb.airbnb_scrapper import open_driver
+
+    # A página é local: os padrões de domínio casam com o caminho /3p/<domínio>/.
+    ready, loaded, transferred = [], [], []
+    with open_driver(profile) as driver:
+        for _ in range(runs):
+            FixtureHandler.bytes_served = 0
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            started = time.perf_counter()
+            driver.get(url)
+            loaded.append(time.perf_counter() - started)
+            WebDriverWait(driver, 30).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, '[data-testid="book-it-total-price"]')
+                )
+            )
+            ready.append(time.perf_counter() - started)
+            # Recursos que ainda chegam depois do preço também contam.
+            time.sleep(1)
+            transferred.append(FixtureHandler.bytes_served)
+
+    return {
+        "profile": profile,
+        "runs": runs,
+        "page_ready_ms_median": round(statistics.median(ready) * 1000, 1),
+        "get_returned_ms_median": round(statistics.median(loaded) * 1000, 1),
+        "kb_transferred_median": round(statistics.median(transferred) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", default="full,lean")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="Grava os resultados em JSON.")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/listing.html"
+    try:
+        results = [
+            measure(profile, url, args.runs) for profile in args.profiles.split(",")
+        ]
+    finally:
+        server.shutdown()
+
+    for result in results:
+        print(
+            "perfil={profile:<5} página pronta={page_ready_ms_median}ms "
+            "get={get_returned_ms_median}ms transferido={kb_transferred_median}KB".format(
+                **result
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark de cold start do consumer.
+
+Mede, em processos novos, o tempo de importar o ``consumer`` e lista os
+pacotes mais caros (``python -X importtime``). Depois mede, com os fakes,
+o warm-up do agente e a latência da primeira e da segunda mensagem.
+
+Uso:
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --top 15 --output startup.json
+"""
+
+import io
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import contextlib
+import subprocess
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+from .fakes import FakeChannel, install_fakes
+from .payloads import generate_conversations
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[str, int]]]:
+    """Importa o módulo num processo novo.
+
+    Returns:
+        (segundos de parede, [(pacote de topo, microssegundos cumulativos)])
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    # Linhas: "import time:  self [us] | cumulative | imported package"
+    packages: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Só os imports de primeiro nível; os aninhados são indentados.
+        if not name.startswith("  "):
+            top = name.strip().split(".")[0]
+            packages[top] = packages.get(top, 0) + int(cumulative)
+    return elapsed, sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def measure_warm_start() -> Dict:
+    """Mede warm-up e primeiras mensagens no processo atual, com fakes."""
+    import consumer
+    from ia_hub.agents.agent_factory import agent_factory
+
+    fakes = install_fakes(llm_latency=0.0, scraper_latency=0.0)
+    consumer.publisher = fakes["broker"]
+
+    started = time.perf_counter()
+    agent_factory.warm_up()
+    warm_up = time.perf_counter() - started
+
+    channel = FakeChannel()
+    latencies = []
+    payloads = generate_conversations(1, 2)[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for tag, payload in enumerate(payloads, start=1):
+            body = json.dumps(payload).encode("utf-8")
+            method = SimpleNamespace(delivery_tag=tag)
+            started = time.perf_counter()
+            consumer.callback(channel, method, None, body)
+            latencies.append(time.perf_counter() - started)
+
+    return {
+        "warm_up_ms": round(warm_up * 1000, 1),
+        "first_message_ms": round(latencies[0] * 1000, 1),
+        "second_message_ms": round(latencies[1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="consumer")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", help="Grava os resultados em JSON.")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    timings, packages = [], []
+    for _ in range(args.runs):
+        elapsed, packages = measure_import(args.module)
+        timings.append(elapsed)
+
+    result = {
+        "module": args.module,
+        "import_s_median": round(statistics.median(timings), 3),
+        "import_s_max": round(max(timings), 3),
+        "top_packages_ms": {
+            name: round(micros / 1000, 1) for name, micros in packages[: args.top]
+        },
+        **measure_warm_start(),
+    }
+
+    print(
+        f"import {args.module}: mediana={result['import_s_median']}s "
+        f"máx={result['import_s_max']}s"
+    )
+    for name, millis in result["top_packages_ms"].items():
+        print(f"  {name:<30} {millis:>8} ms")
+    print(
+        "warm-up={warm_up_ms}ms primeira mensagem={first_message_ms}ms "
+        "segunda mensagem={second_message_ms}ms".format(**result)
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
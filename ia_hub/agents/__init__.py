@@ -1,14 +1,23 @@
-"""Módulo de agentes - Facilita imports."""
-
-from .agent_runner import AgentRunner
-from .agent_factory import agent_factory
-from .session_manager import session_manager
-from .message_services import WhatsAppMessageProcessor, InteractiveChatService
-
-__all__ = [
-    "AgentRunner",
-    "agent_factory",
-    "session_manager",
-    "WhatsAppMessageProcessor",
-    "InteractiveChatService",
-]
+"""Módulo de agentes - Facilita imports.
+
+Os nomes são carregados no primeiro acesso, para que importar um submódulo
+leve (ex.: ``ia_hub.agents.publisher``) não carregue o LangGraph.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "AgentRunner": ".agent_runner",
+    "agent_factory": ".agent_factory",
+    "session_manager": ".session_manager",
+    "WhatsAppMessageProcessor": ".message_services",
+    "InteractiveChatService": ".message_services",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,26 @@
 """Factory para criação e configuração de agentes."""
 
 import os
+import logging
+import threading
 from typing import Optional
 
-from langchain.chat_models import init_chat_model
 from langgraph.prebuilt import create_react_agent
 from langgraph.checkpoint.postgres import PostgresSaver
 
+from . import tools
 from .tools import get_tools
+from .tool_executor import get_tool_executor
+from .checkpoint_serializer import checkpoint_serializer
 from .summarization import get_summarization_node
+from .model_router import MODEL_SUMMARY_TIER, RoutedChatModel, model_router
+from ..observability import span
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTER_POOL_SIZE = int(os.getenv("CHECKPOINTER_POOL_SIZE", "10"))
+# Abre o chromedriver/Chrome no warm-up; desligue se o consumer não usa o scraper.
+WARM_UP_SCRAPER = os.getenv("WARM_UP_SCRAPER", "true").lower() == "true"
 
 
 class AgentFactory:
@@ -16,6 +28,8 @@ class AgentFactory:
 
     _instance = None
     _agent_executor = None
+    _pool = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -23,9 +37,14 @@ class AgentFactory:
         return cls._instance
 
     @staticmethod
-    def get_model():
-        """Configura e retorna o modelo de chat."""
-        return init_chat_model(model="gpt-4")
+    def get_model(tier: Optional[str] = None):
+        """Configura e retorna o modelo de chat.
+
+        Args:
+            tier: Camada fixa ("fast" ou "strong"); sem ela o roteador escolhe
+                o modelo a cada chamada.
+        """
+        return RoutedChatModel(router=model_router, tier=tier)
 
     @staticmethod
     def get_checkpointer() -> Optional[PostgresSaver]:
@@ -40,30 +59,99 @@ class AgentFactory:
             print(f"Erro ao criar checkpointer: {e}")
             return None
 
+    def get_pooled_checkpointer(self) -> Optional[PostgresSaver]:
+        """Cria o checkpointer sobre um pool de conexões compartilhado entre mensagens."""
+        postgres_url = os.getenv("POSTGRES_URL")
+        if not postgres_url:
+            return None
+
+        from psycopg.rows import dict_row
+        from psycopg_pool import ConnectionPool
+
+        self._pool = ConnectionPool(
+            postgres_url,
+            max_size=CHECKPOINTER_POOL_SIZE,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": 0,
+                "row_factory": dict_row,
+            },
+            open=True,
+        )
+        return PostgresSaver(self._pool, serde=checkpoint_serializer)
+
     def create_agent_executor(self, checkpointer: Optional[PostgresSaver] = None):
         """Cria o executor do agente com as ferramentas e checkpoint."""
         if checkpointer:
-            checkpointer.setup()
-
-        model = self.get_model()
-        tools = get_tools()
-        summarization_node = get_summarization_node(model)
-
-        return create_react_agent(
-            debug=True,
-            tools=tools,
-            model=model,
-            checkpointer=checkpointer,
-            pre_model_hook=summarization_node,
-        )
+            with span("checkpointer.setup"):
+                checkpointer.setup()
+
+        with span("graph.build"):
+            model = self.get_model()
+            tools = get_tool_executor(get_tools())
+            summarization_node = get_summarization_node(
+                self.get_model(tier=MODEL_SUMMARY_TIER)
+            )
+
+            return create_react_agent(
+                debug=True,
+                tools=tools,
+                model=model,
+                checkpointer=checkpointer,
+                pre_model_hook=summarization_node,
+            )
 
     def get_agent_executor(self):
-        """Retorna uma instância singleton do agent_executor."""
+        """Retorna uma instância singleton do agent_executor.
+
+        O grafo é compilado uma vez, com o checkpointer sobre o pool de
+        conexões, e compartilhado entre as mensagens.
+        """
         if self._agent_executor is None:
-            checkpointer = self.get_checkpointer()
-            self._agent_executor = self.create_agent_executor(checkpointer)
+            with self._lock:
+                if self._agent_executor is None:
+                    checkpointer = self.get_pooled_checkpointer()
+                    try:
+                        self._agent_executor = self.create_agent_executor(checkpointer)
+                    except Exception:
+                        # Banco fora do ar: a próxima chamada tenta com um pool novo.
+                        if self._pool is not None:
+                            self._pool.close()
+                            self._pool = None
+                        raise
+        return self._agent_executor
+
+    def warm_up(self):
+        """Prepara antes do consumo o que a primeira mensagem pagaria.
+
+        Cria o pool e o schema do checkpoint, compila o grafo e resolve o
+        chromedriver. Depois disso ``execute_with_agent`` reusa o grafo.
+        """
+        with span("warm_up"):
+            self.get_agent_executor()
+            if WARM_UP_SCRAPER:
+                try:
+                    tools.warm_up_scraper()
+                except Exception as e:
+                    # O scraper é resolvido de novo na primeira consulta.
+                    logger.warning("Falha no warm-up do scraper: %s", e)
+
+    def get_warm_executor(self):
+        """Retorna o grafo preparado por ``warm_up`` ou None se ainda não há.
+
+        Para atalhos (cache de respostas) que não compensam compilar um grafo.
+        """
         return self._agent_executor
 
+    def close(self):
+        """Fecha o pool do checkpointer e os navegadores abertos."""
+        with self._lock:
+            self._agent_executor = None
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+        tools.shutdown_scrapers()
+
     def execute_with_agent(self, callback, *args, **kwargs):
         """Executa uma função passando o agent_executor como primeiro parâmetro.
 
@@ -74,9 +162,14 @@ class AgentFactory:
         Returns:
             O resultado da execução da função callback
         """
+        if self._agent_executor is not None:
+            # Grafo preparado por warm_up.
+            return callback(self._agent_executor, *args, **kwargs)
+
         checkpointer = self.get_checkpointer()
         if checkpointer:
             with checkpointer as cp:
+                cp.serde = checkpoint_serializer
                 agent_executor = self.create_agent_executor(cp)
                 return callback(agent_executor, *args, **kwargs)
         else:
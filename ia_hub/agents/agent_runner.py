@@ -12,8 +12,9 @@ class AgentRunner:
         self.whatsapp_processor = WhatsAppMessageProcessor()
         self.interactive_service = InteractiveChatService()
 
-    def chat_single(self, payload: dict):
-        """Executa uma única mensagem e retorna a resposta."""
+    def chat_single(self, payload):
+        """Executa uma única mensagem (envelope ou payload) e retorna a resposta."""
+        self.session_config.record_turn()
         return self.whatsapp_processor.process_single_message(
             payload, self.session_config
         )
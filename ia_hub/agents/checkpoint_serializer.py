@@ -0,0 +1,116 @@
+"""Serializador compactado para os checkpoints do LangGraph.
+
+Os valores continuam sendo codificados pelo ``JsonPlusSerializer`` (msgpack
+para objetos LangChain); acima de um tamanho mínimo o resultado é compactado
+com zstd, quando o pacote ``zstandard`` está instalado, ou zlib. O algoritmo
+vai como sufixo do tipo (``msgpack+zstd``), então checkpoints gravados antes
+continuam legíveis e dá para trocar a configuração sem migrar dados.
+
+O padrão é não compactar: réplicas anteriores a este serializador não leem
+``msgpack+zstd``. Para ligar, primeiro publique esta versão em todas as
+réplicas com ``CHECKPOINT_COMPRESSION=none`` (todas passam a ler os dois
+formatos, com o pacote ``zstandard`` instalado) e só depois mude para
+``zstd`` ou ``zlib``. Para desligar basta voltar para ``none``: o que foi
+gravado compactado continua legível.
+"""
+
+import os
+import zlib
+import logging
+from typing import Any, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# "none", "zstd" (cai para zlib sem o pacote zstandard) ou "zlib".
+CHECKPOINT_COMPRESSION = os.getenv("CHECKPOINT_COMPRESSION", "none").lower()
+CHECKPOINT_COMPRESSION_LEVEL = int(os.getenv("CHECKPOINT_COMPRESSION_LEVEL", "3"))
+# Valores pequenos (contadores, flags) não compensam a compactação.
+CHECKPOINT_COMPRESSION_MIN_BYTES = int(
+    os.getenv("CHECKPOINT_COMPRESSION_MIN_BYTES", "512")
+)
+
+
+class _Zstd:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        # Compressor por chamada: os objetos do zstandard não são thread-safe.
+        return zstandard.ZstdCompressor(level=self._level).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+class _Zlib:
+    name = "zlib"
+
+    def __init__(self, level: int):
+        self._level = min(level, 9)
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self._level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+def _get_codec(name: str, level: int):
+    if name == "zstd":
+        if zstandard is not None:
+            return _Zstd(level)
+        logger.warning("Pacote zstandard não instalado, usando zlib nos checkpoints.")
+        return _Zlib(level)
+    if name == "zlib":
+        return _Zlib(level)
+    return None
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Envolve um serializador e compacta os valores grandes."""
+
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        compression: str = CHECKPOINT_COMPRESSION,
+        level: int = CHECKPOINT_COMPRESSION_LEVEL,
+        min_bytes: int = CHECKPOINT_COMPRESSION_MIN_BYTES,
+    ):
+        self.serde = serde or JsonPlusSerializer()
+        self.codec = _get_codec(compression, level)
+        self.min_bytes = min_bytes
+        # Lê qualquer formato gravado, mesmo que a configuração tenha mudado.
+        self._decoders = {"zlib": _Zlib(level)}
+        if zstandard is not None:
+            self._decoders["zstd"] = _Zstd(level)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if self.codec is None or len(data) < self.min_bytes:
+            return type_, data
+        return f"{type_}+{self.codec.name}", self.codec.compress(data)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        base, compressed, codec = type_.rpartition("+")
+        if not compressed:
+            return self.serde.loads_typed(data)
+
+        decoder = self._decoders.get(codec)
+        if decoder is None:
+            raise ValueError(f"Checkpoint compactado com {codec}, não disponível aqui.")
+        return self.serde.loads_typed((base, decoder.decompress(payload)))
+
+
+# Instância singleton
+checkpoint_serializer = CompressedSerializer()
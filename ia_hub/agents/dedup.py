@@ -0,0 +1,236 @@
+"""Deduplicação de mensagens pelo id da mensagem do WhatsApp."""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from ..observability.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_POSTGRES = os.getenv("DEDUP_POSTGRES", "false").lower() == "true"
+DEDUP_TTL_SECONDS = float(os.getenv("DEDUP_TTL_SECONDS", "86400"))
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "100000"))
+# Um processamento "em andamento" mais antigo que isso é considerado abandonado
+# (ex.: réplica morta) e pode ser reivindicado de novo.
+DEDUP_LEASE_SECONDS = float(os.getenv("DEDUP_LEASE_SECONDS", "300"))
+# Espera antes de devolver ao broker uma entrega cuja mensagem ainda está em
+# processamento em outra execução.
+DEDUP_RETRY_DELAY_SECONDS = float(os.getenv("DEDUP_RETRY_DELAY_SECONDS", "5"))
+# Conexões do pool do Postgres da deduplicação (uma consulta curta por mensagem).
+DEDUP_POOL_MAX_SIZE = int(os.getenv("DEDUP_POOL_MAX_SIZE", "4"))
+
+DUPLICATES_TOTAL = registry.counter(
+    "ia_hub_duplicate_messages_total", "Mensagens duplicadas descartadas, por estado."
+)
+
+NEW = "new"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS processed_messages (
+    message_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    reply JSONB,
+    claimed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    completed_at TIMESTAMPTZ
+)
+"""
+
+# Insere a reivindicação; em conflito só reassume se o lease anterior expirou.
+CLAIM_SQL = """
+INSERT INTO processed_messages (message_id, status, claimed_at)
+VALUES (%s, 'in_progress', now())
+ON CONFLICT (message_id) DO UPDATE
+    SET claimed_at = now()
+    WHERE processed_messages.status = 'in_progress'
+      AND processed_messages.claimed_at < now() - make_interval(secs => %s)
+RETURNING message_id
+"""
+
+ClaimResult = Tuple[str, Optional[Dict[str, Any]]]
+
+
+class MessageInProgress(Exception):
+    """Outra execução ainda processa a mensagem; a entrega deve voltar à fila.
+
+    Confirmar essa entrega perderia a mensagem se a outra execução falhar
+    (ou a réplica dela morrer) antes de terminar.
+    """
+
+
+class MessageDeduplicator:
+    """Registra mensagens processadas em um LRU em memória e, opcionalmente, no Postgres.
+
+    ``claim`` é chamado antes de qualquer trabalho do agente: retorna
+    ``new`` para a primeira entrega, ``in_progress`` se outra execução está
+    em andamento e ``done`` (com a resposta publicada) se já terminou.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEDUP_TTL_SECONDS,
+        max_entries: int = DEDUP_MAX_ENTRIES,
+        lease_seconds: float = DEDUP_LEASE_SECONDS,
+        postgres_url: Optional[str] = None,
+        pool_max_size: int = DEDUP_POOL_MAX_SIZE,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lease_seconds = lease_seconds
+        self.postgres_url = postgres_url
+        self.pool_max_size = pool_max_size
+        # message_id -> (status, resposta, expira_em)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+
+    def _store(self, message_id: str, status: str, reply=None) -> None:
+        """Grava a entrada no LRU; chamar com ``self._lock`` já adquirido."""
+        ttl = self.ttl_seconds if status == DONE else self.lease_seconds
+        self._entries[message_id] = (status, reply, time.monotonic() + ttl)
+        self._entries.move_to_end(message_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _remember(self, message_id: str, status: str, reply=None) -> None:
+        with self._lock:
+            self._store(message_id, status, reply)
+
+    def _lookup_or_reserve(self, message_id: str) -> Optional[ClaimResult]:
+        """Retorna a entrada válida da mensagem ou a reserva como em andamento.
+
+        A consulta e a reserva ficam sob o mesmo lock: de duas entregas
+        simultâneas da mesma mensagem, só uma recebe None e segue adiante.
+        """
+        with self._lock:
+            entry = self._entries.get(message_id)
+            if entry is not None:
+                status, reply, expires_at = entry
+                if expires_at > time.monotonic():
+                    return status, reply
+            self._store(message_id, IN_PROGRESS)
+            return None
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Cria o pool e a tabela na primeira consulta ao Postgres."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    pool = ThreadedConnectionPool(
+                        1, self.pool_max_size, self.postgres_url
+                    )
+                    connection = pool.getconn()
+                    try:
+                        with connection, connection.cursor() as cursor:
+                            cursor.execute(CREATE_TABLE_SQL)
+                            # Limpa registros antigos uma vez por processo.
+                            cursor.execute(
+                                "DELETE FROM processed_messages "
+                                "WHERE claimed_at < now() - make_interval(secs => %s)",
+                                (self.ttl_seconds,),
+                            )
+                    except psycopg2.Error:
+                        pool.closeall()
+                        raise
+                    pool.putconn(connection)
+                    self._pool = pool
+        return self._pool
+
+    @contextmanager
+    def _connection(self):
+        """Empresta uma conexão do pool; descarta a que falhou por rede."""
+        pool = self._get_pool()
+        connection = pool.getconn()
+        broken = False
+        try:
+            yield connection
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            pool.putconn(connection, close=broken or bool(connection.closed))
+
+    def _claim_postgres(self, message_id: str) -> ClaimResult:
+        with self._connection() as connection:
+            with connection, connection.cursor() as cursor:
+                cursor.execute(CLAIM_SQL, (message_id, self.lease_seconds))
+                if cursor.fetchone():
+                    return NEW, None
+                cursor.execute(
+                    "SELECT status, reply FROM processed_messages WHERE message_id = %s",
+                    (message_id,),
+                )
+                row = cursor.fetchone()
+                return (row[0], row[1]) if row else (NEW, None)
+
+    def claim(self, message_id: str) -> ClaimResult:
+        """Reivindica o processamento da mensagem."""
+        cached = self._lookup_or_reserve(message_id)
+        if cached is not None:
+            return cached
+
+        if self.postgres_url:
+            try:
+                status, reply = self._claim_postgres(message_id)
+            except psycopg2.Error as e:
+                # Sem o banco, a deduplicação em memória ainda protege a réplica.
+                logger.warning("Falha na deduplicação no Postgres: %s", e)
+                status, reply = NEW, None
+        else:
+            status, reply = NEW, None
+
+        if status != NEW:
+            self._remember(message_id, status, reply)
+        return status, reply
+
+    def complete(self, message_id: str, reply: Dict[str, Any]) -> None:
+        """Marca a mensagem como processada guardando a resposta publicada."""
+        self._remember(message_id, DONE, reply)
+        if not self.postgres_url:
+            return
+        try:
+            with self._connection() as connection:
+                with connection, connection.cursor() as cursor:
+                    cursor.execute(
+                        "UPDATE processed_messages "
+                        "SET status = 'done', reply = %s, completed_at = now() "
+                        "WHERE message_id = %s",
+                        (json.dumps(reply), message_id),
+                    )
+        except psycopg2.Error as e:
+            logger.warning("Falha ao registrar mensagem processada: %s", e)
+
+    def release(self, message_id: str) -> None:
+        """Libera a reivindicação após uma falha, permitindo a reentrega."""
+        with self._lock:
+            self._entries.pop(message_id, None)
+        if not self.postgres_url:
+            return
+        try:
+            with self._connection() as connection:
+                with connection, connection.cursor() as cursor:
+                    cursor.execute(
+                        "DELETE FROM processed_messages "
+                        "WHERE message_id = %s AND status = 'in_progress'",
+                        (message_id,),
+                    )
+        except psycopg2.Error as e:
+            logger.warning("Falha ao liberar mensagem %s: %s", message_id, e)
+
+
+# Instância singleton
+message_deduplicator = MessageDeduplicator(
+    postgres_url=os.getenv("POSTGRES_URL") if DEDUP_POSTGRES else None
+)
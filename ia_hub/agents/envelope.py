@@ -0,0 +1,122 @@
+"""Envelope compacto das mensagens do WhatsApp que passam pelo pipeline."""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decodifica JSON com orjson quando disponível.
+
+    Erros de decodificação são ``json.JSONDecodeError`` nos dois casos.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Codifica JSON em UTF-8 com orjson quando disponível."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _object(value, required: bool = False) -> Dict[str, Any]:
+    """O objeto JSON ``value``; ausente vira ``{}`` se não for obrigatório."""
+    if value is None and not required:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError("invalid envelope")
+    return value
+
+
+def _first(items, required: bool = False) -> Dict[str, Any]:
+    """Primeiro objeto da lista; obrigatória, ela precisa ter ao menos um."""
+    if items is None and not required:
+        return {}
+    if not isinstance(items, list) or (required and not items):
+        raise ValueError("invalid envelope")
+    return _object(items[0], required=True) if items else {}
+
+
+@dataclass(slots=True, frozen=True)
+class MessageEnvelope:
+    """Campos do webhook usados pelo pipeline, extraídos uma única vez.
+
+    ``message`` guarda o objeto da mensagem do WhatsApp (sem o restante do
+    webhook) para os tipos que precisam de mais do que o texto.
+    """
+
+    display_phone_number: Optional[str]
+    phone_number_id: Optional[str]
+    wa_id: Optional[str]
+    message_id: Optional[str] = None
+    message_type: Optional[str] = None
+    text: Optional[str] = None
+    timestamp: Optional[str] = None
+    message: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "MessageEnvelope":
+        """Extrai o envelope do payload do webhook da WhatsApp Business API.
+
+        Raises:
+            ValueError: O payload não tem a forma do webhook (entry, changes e
+                value obrigatórios; os demais níveis, se presentes, com o tipo
+                esperado).
+        """
+        entry = _first(_object(payload, required=True).get("entry"), required=True)
+        change = _first(entry.get("changes"), required=True)
+        value = _object(change.get("value"), required=True)
+        metadata = _object(value.get("metadata"))
+        message = _first(value.get("messages"))
+        text = _object(message.get("text")).get("body")
+
+        return cls(
+            display_phone_number=metadata.get("display_phone_number"),
+            phone_number_id=metadata.get("phone_number_id"),
+            wa_id=_first(value.get("contacts")).get("wa_id") or message.get("from"),
+            message_id=message.get("id"),
+            message_type=message.get("type") or ("text" if text else None),
+            text=text,
+            timestamp=message.get("timestamp"),
+            message=message or None,
+        )
+
+    @classmethod
+    def parse(
+        cls, data: Union[bytes, str, Dict[str, Any], "MessageEnvelope"]
+    ) -> "MessageEnvelope":
+        """Aceita o corpo da mensagem do broker, o payload já decodificado ou um envelope.
+
+        Erros de JSON (``json.JSONDecodeError``) e de formato são ValueError.
+        """
+        if isinstance(data, cls):
+            return data
+        if isinstance(data, (bytes, bytearray, str)):
+            data = loads(data)
+        return cls.from_payload(data)
+
+    @property
+    def owner_id(self) -> Optional[str]:
+        return self.display_phone_number
+
+    @property
+    def thread_id(self) -> str:
+        return f"{self.display_phone_number}.{self.wa_id}"
+
+    def reply(self, body: str) -> Dict[str, Any]:
+        """Monta a mensagem de saída no esquema compacto."""
+        return {
+            "to": self.wa_id,
+            "phone_number_id": self.phone_number_id,
+            "display_phone_number": self.display_phone_number,
+            "in_reply_to": self.message_id,
+            "content": {"text": {"body": body}},
+        }
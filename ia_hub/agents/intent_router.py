@@ -0,0 +1,131 @@
+"""Roteador de intenções simples que responde sem executar o agente."""
+
+import os
+import re
+import math
+import logging
+import unicodedata
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "false").lower() == "true"
+INTENT_ROUTER_SEMANTIC = os.getenv("INTENT_ROUTER_SEMANTIC", "false").lower() == "true"
+INTENT_ROUTER_THRESHOLD = float(os.getenv("INTENT_ROUTER_THRESHOLD", "0.85"))
+# Mensagens mais longas que isso sempre vão para o agente completo.
+INTENT_ROUTER_MAX_WORDS = int(os.getenv("INTENT_ROUTER_MAX_WORDS", "6"))
+
+# As regras casam a mensagem inteira (já normalizada), nunca um trecho:
+# "oi, o apartamento está livre?" precisa chegar ao agente.
+INTENT_PATTERNS: Dict[str, re.Pattern] = {
+    "greeting": re.compile(
+        r"^(oi+|ola|opa|eai|e ai|hey|hello|hi|bom dia|boa tarde|boa noite)"
+        r"( (tudo (bem|bom|certo)|td bem|como vai))?$"
+    ),
+    "thanks": re.compile(
+        r"^(muito )?(obrigad[oa]|obg|valeu|vlw|agradeco|thanks|thank you)"
+        r"( (mesmo|demais|pela ajuda))?$"
+    ),
+    "farewell": re.compile(r"^(tchau|ate (logo|mais|breve)|falou|bye)$"),
+    "current_time": re.compile(
+        r"^(que horas sao|que hora e|qual (e )?a hora|que dia e hoje)( agora)?$"
+    ),
+}
+
+# Exemplos usados pelo vizinho mais próximo por embeddings.
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "greeting": ["oi", "olá, tudo bem?", "bom dia", "boa noite, como vai?"],
+    "thanks": ["obrigado", "muito obrigada pela ajuda", "valeu mesmo"],
+    "farewell": ["tchau", "até logo", "até mais"],
+    "current_time": ["que horas são?", "que dia é hoje?"],
+}
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sem acentos, sem pontuação/emojis e espaços colapsados."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w\s]", " ", without_accents).split())
+
+
+class IntentRouter:
+    """Classifica mensagens triviais e gera respostas prontas para elas."""
+
+    def __init__(self, embeddings=None, threshold: float = INTENT_ROUTER_THRESHOLD):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self._example_vectors: Optional[List[tuple]] = None
+
+    def _nearest_intent(self, text: str) -> Optional[str]:
+        """Vizinho mais próximo entre os exemplos, se acima do limiar."""
+        if self._example_vectors is None:
+            examples = [
+                (intent, example)
+                for intent, values in INTENT_EXAMPLES.items()
+                for example in values
+            ]
+            vectors = self.embeddings.embed_documents([e for _, e in examples])
+            self._example_vectors = [
+                (intent, vector) for (intent, _), vector in zip(examples, vectors)
+            ]
+
+        query = self.embeddings.embed_query(text)
+        query_norm = math.sqrt(sum(v * v for v in query)) or 1.0
+        best_intent, best_score = None, 0.0
+        for intent, vector in self._example_vectors:
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            score = sum(a * b for a, b in zip(query, vector)) / (norm * query_norm)
+            if score > best_score:
+                best_intent, best_score = intent, score
+
+        return best_intent if best_score >= self.threshold else None
+
+    def classify(self, content: Optional[str]) -> Optional[str]:
+        """Retorna a intenção trivial da mensagem ou None se for substantiva."""
+        if not content:
+            return None
+
+        text = normalize_text(content)
+        if not text or len(text.split()) > INTENT_ROUTER_MAX_WORDS:
+            return None
+
+        for intent, pattern in INTENT_PATTERNS.items():
+            if pattern.match(text):
+                return intent
+
+        if self.embeddings is not None:
+            try:
+                return self._nearest_intent(text)
+            except Exception as e:
+                logger.warning("Falha na classificação por embeddings: %s", e)
+        return None
+
+    @staticmethod
+    def reply(intent: str) -> str:
+        """Gera a resposta pronta para a intenção."""
+        if intent == "greeting":
+            return "Olá! 😊 Como posso ajudar com a sua hospedagem?"
+        if intent == "thanks":
+            return "Por nada! Se precisar de mais alguma coisa, é só chamar."
+        if intent == "farewell":
+            return "Até logo! Qualquer dúvida, estou por aqui."
+        if intent == "current_time":
+            now = datetime.now(ZoneInfo("America/Sao_Paulo"))
+            return f"Agora são {now:%H:%M} de {now:%d/%m/%Y} (horário de Brasília)."
+        raise ValueError(f"Intenção desconhecida: {intent}")
+
+
+def _create_intent_router() -> IntentRouter:
+    embeddings = None
+    if INTENT_ROUTER_SEMANTIC:
+        from ..knowledge.embeddings import get_embeddings
+
+        # Vetores só em memória: não precisam seguir a dimensão da base.
+        embeddings = get_embeddings("text-embedding-3-small", dimensions=None)
+    return IntentRouter(embeddings=embeddings)
+
+
+# Instância singleton
+intent_router = _create_intent_router()
@@ -0,0 +1,269 @@
+"""Pré-processamento por tipo de mensagem e pool separado para mídias."""
+
+import os
+import json
+import logging
+import threading
+import dataclasses
+import urllib.request
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from .envelope import MessageEnvelope
+from ..observability import span
+from ..observability.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Sem o pool de mídia, áudios e imagens sem legenda recebem a resposta padrão.
+MEDIA_ENABLED = os.getenv("MEDIA_ENABLED", "false").lower() == "true"
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "2"))
+# Mídias aguardando o pool; acima disso a mensagem recebe a resposta padrão.
+MEDIA_QUEUE_SIZE = int(os.getenv("MEDIA_QUEUE_SIZE", "32"))
+MEDIA_TIMEOUT_SECONDS = float(os.getenv("MEDIA_TIMEOUT_SECONDS", "60"))
+MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(16 * 1024 * 1024)))
+MEDIA_TRANSCRIPTION_MODEL = os.getenv("MEDIA_TRANSCRIPTION_MODEL", "whisper-1")
+WHATSAPP_GRAPH_URL = os.getenv("WHATSAPP_GRAPH_URL", "https://graph.facebook.com/v20.0")
+
+UNSUPPORTED_REPLY = (
+    "Recebi sua mensagem, mas ainda não consigo entender esse tipo de conteúdo. "
+    "Pode me escrever em texto?"
+)
+
+MESSAGE_TYPES = registry.counter(
+    "ia_hub_message_types_total", "Mensagens recebidas por tipo e ação."
+)
+MEDIA_QUEUED = registry.gauge(
+    "ia_hub_media_queued", "Mídias aguardando ou em processamento no pool."
+)
+
+# Ações do pré-processamento
+AGENT = "agent"
+REPLY = "reply"
+DROP = "drop"
+MEDIA = "media"
+
+# Tipos sem conteúdo para o agente (reações, figurinhas, eventos do sistema).
+DROPPED_TYPES = {"reaction", "sticker", "system", "ephemeral"}
+MEDIA_TYPES = {"audio", "image", "video", "document"}
+MEDIA_LABELS = {
+    "audio": "Áudio",
+    "image": "Imagem",
+    "video": "Vídeo",
+    "document": "Documento",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class Preprocessed:
+    """Resultado do pré-processamento: o que fazer com a mensagem."""
+
+    action: str
+    envelope: MessageEnvelope
+    reply: Optional[str] = None
+
+
+def _as_text(envelope: MessageEnvelope, text: str) -> Preprocessed:
+    return Preprocessed(
+        AGENT, dataclasses.replace(envelope, message_type="text", text=text)
+    )
+
+
+def _inline_text(envelope: MessageEnvelope) -> Optional[str]:
+    """Texto de tipos que já trazem o conteúdo no próprio payload."""
+    message = envelope.message or {}
+    kind = envelope.message_type
+
+    if kind == "button":
+        return message.get("button", {}).get("text")
+    if kind == "interactive":
+        interactive = message.get("interactive", {})
+        reply = interactive.get("button_reply") or interactive.get("list_reply") or {}
+        return " - ".join(
+            part for part in (reply.get("title"), reply.get("description")) if part
+        )
+    if kind == "location":
+        location = message.get("location", {})
+        parts = [
+            part for part in (location.get("name"), location.get("address")) if part
+        ]
+        parts.append(f"({location.get('latitude')}, {location.get('longitude')})")
+        return "[Localização compartilhada] " + " ".join(parts)
+    return None
+
+
+def _caption(envelope: MessageEnvelope) -> Optional[str]:
+    media = (envelope.message or {}).get(envelope.message_type, {})
+    return media.get("caption") or None
+
+
+def preprocess(envelope: MessageEnvelope) -> Preprocessed:
+    """Classifica a mensagem sem I/O e decide se ela vai para o agente.
+
+    Texto vai direto; botões, listas e localização viram texto; reações e
+    figurinhas são descartadas; mídias vão para o pool (``MEDIA``) ou, sem
+    ele, usam a legenda ou a resposta padrão.
+    """
+    kind = envelope.message_type
+    result = None
+
+    if kind == "text" or (kind is None and envelope.text):
+        text = (envelope.text or "").strip()
+        result = Preprocessed(AGENT, envelope) if text else Preprocessed(DROP, envelope)
+    elif kind in DROPPED_TYPES or kind is None:
+        result = Preprocessed(DROP, envelope)
+    elif kind in MEDIA_TYPES:
+        if MEDIA_ENABLED:
+            result = Preprocessed(MEDIA, envelope)
+        elif _caption(envelope):
+            result = _as_text(envelope, f"[{MEDIA_LABELS[kind]}] {_caption(envelope)}")
+    else:
+        text = _inline_text(envelope)
+        if text:
+            result = _as_text(envelope, text)
+
+    if result is None:
+        result = Preprocessed(REPLY, envelope, UNSUPPORTED_REPLY)
+    if result.action != MEDIA:
+        # Uma vez por mensagem, pelo tipo original: a mídia é contada depois
+        # da conversão, com a ação final.
+        original = (envelope.message or {}).get("type") or kind
+        MESSAGE_TYPES.inc(type=original or "empty", action=result.action)
+    return result
+
+
+def needs_media_worker(envelope: MessageEnvelope) -> bool:
+    """Indica se a mensagem precisa do pool de mídia antes do agente."""
+    return MEDIA_ENABLED and envelope.message_type in MEDIA_TYPES
+
+
+def _graph_get(url: str, token: str) -> bytes:
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(request, timeout=MEDIA_TIMEOUT_SECONDS) as response:
+        data = response.read(MEDIA_MAX_BYTES + 1)
+    if len(data) > MEDIA_MAX_BYTES:
+        raise ValueError("Mídia maior que MEDIA_MAX_BYTES.")
+    return data
+
+
+def download_media(media_id: str) -> bytes:
+    """Baixa a mídia pela Graph API (URL temporária e depois o conteúdo)."""
+    token = os.getenv("WHATSAPP_TOKEN", "")
+    info = json.loads(_graph_get(f"{WHATSAPP_GRAPH_URL}/{media_id}", token))
+    return _graph_get(info["url"], token)
+
+
+def transcribe_audio(envelope: MessageEnvelope) -> Optional[str]:
+    """Transcreve o áudio com o modelo de transcrição da OpenAI."""
+    from openai import OpenAI
+
+    audio = (envelope.message or {}).get("audio", {})
+    data = download_media(audio["id"])
+    transcription = OpenAI().audio.transcriptions.create(
+        model=MEDIA_TRANSCRIPTION_MODEL,
+        file=("audio.ogg", data, audio.get("mime_type", "audio/ogg")),
+    )
+    return transcription.text
+
+
+def describe_media(envelope: MessageEnvelope) -> Optional[str]:
+    """Stand-in de OCR: usa a legenda ou o nome do arquivo da mídia."""
+    media = (envelope.message or {}).get(envelope.message_type, {})
+    return media.get("caption") or media.get("filename")
+
+
+class MediaProcessor:
+    """Converte mídias em texto num pool próprio, fora dos workers de texto.
+
+    O trabalho pesado (download, transcrição, OCR) ocupa só este pool, com
+    fila limitada; as conversas de texto seguem nos workers do escalonador.
+    """
+
+    def __init__(
+        self,
+        workers: int = MEDIA_WORKERS,
+        queue_size: int = MEDIA_QUEUE_SIZE,
+        handlers: Optional[Dict[str, Callable]] = None,
+    ):
+        self.handlers = handlers or {
+            "audio": transcribe_audio,
+            "image": describe_media,
+            "video": describe_media,
+            "document": describe_media,
+        }
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="media"
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def convert(self, envelope: MessageEnvelope) -> MessageEnvelope:
+        """Converte a mídia em texto na thread atual.
+
+        Devolve um envelope de texto ou, se não foi possível, um envelope
+        ``unsupported`` que o pré-processamento responde com o padrão.
+        """
+        kind = envelope.message_type
+        try:
+            with span("media.convert", type=kind):
+                text = self.handlers[kind](envelope)
+        except Exception as e:
+            logger.warning("Falha ao processar mídia %s: %s", envelope.message_id, e)
+            text = None
+        if not text:
+            return dataclasses.replace(envelope, message_type="unsupported", text=None)
+        return dataclasses.replace(
+            envelope, message_type="text", text=f"[{MEDIA_LABELS[kind]}] {text}"
+        )
+
+    def _claim_and_convert(
+        self, envelope: MessageEnvelope, claim: Callable[[MessageEnvelope], bool]
+    ) -> MessageEnvelope:
+        if not claim(envelope):
+            # Duplicada: segue sem converter; quem processa a mensagem decide
+            # entre a resposta já publicada e a reentrega.
+            return envelope
+        return self.convert(envelope)
+
+    def submit(
+        self,
+        envelope: MessageEnvelope,
+        claim: Optional[Callable[[MessageEnvelope], bool]] = None,
+    ) -> Future:
+        """Agenda a conversão no pool; com a fila cheia, não converte.
+
+        ``claim`` roda no pool antes do download: se retornar False a mídia
+        não é baixada nem transcrita e o envelope original é devolvido.
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Fila de mídia cheia, mensagem %s.", envelope.message_id)
+            future = Future()
+            future.set_result(
+                dataclasses.replace(envelope, message_type="unsupported", text=None)
+            )
+            return future
+
+        MEDIA_QUEUED.inc()
+
+        def release(_):
+            MEDIA_QUEUED.dec()
+            self._slots.release()
+
+        if claim is None:
+            future = self._executor.submit(self.convert, envelope)
+        else:
+            future = self._executor.submit(self._claim_and_convert, envelope, claim)
+        future.add_done_callback(release)
+        return future
+
+    def resolve(self, envelope: MessageEnvelope) -> MessageEnvelope:
+        """Converte pelo pool e espera o resultado (caminhos síncronos)."""
+        return self.submit(envelope).result()
+
+    def shutdown(self) -> None:
+        """Descarta as mídias não iniciadas; elas voltam à fila sem ack."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Instância singleton
+media_processor = MediaProcessor()
@@ -1,47 +1,121 @@
 """Serviços para processamento de mensagens do WhatsApp."""
 
-from typing import Dict, Any, Optional
-from langchain_core.messages import HumanMessage
+from typing import Dict, Any, Optional, Union
+from langchain_core.messages import AIMessage, HumanMessage
 
 from .agent_factory import agent_factory
+from .envelope import MessageEnvelope
+from .media import AGENT, DROP, MEDIA, media_processor, preprocess
 from .session_manager import SessionConfig
+from .intent_router import INTENT_ROUTER_ENABLED, intent_router, normalize_text
+from .response_cache import (
+    RESPONSE_CACHE_ENABLED,
+    history_before_turn,
+    is_standalone,
+    response_cache,
+)
+from ..observability.llm_callbacks import llm_metrics_callback
+from ..observability.metrics import LLM_CALLS_AVOIDED
 
 
 class WhatsAppMessageProcessor:
     """Processa mensagens do WhatsApp Business API."""
 
     @staticmethod
-    def extract_message_content(payload: Dict[str, Any]) -> Optional[str]:
-        """Extrai o conteúdo da mensagem do payload do WhatsApp."""
+    def extract_message_content(
+        payload: Union[MessageEnvelope, Dict[str, Any]],
+    ) -> Optional[str]:
+        """Extrai o conteúdo da mensagem do envelope ou do payload do WhatsApp."""
         try:
-            entries = payload.get("entry", [])
-            entry = entries[0] if entries else {}
-            changes = entry.get("changes", [])
-            change = changes[0] if changes else {}
-            value = change.get("value", {})
-
-            messages = value.get("messages", [])
-            message = messages[0] if messages else {}
-            text = message.get("text", {})
-            content = text.get("body", "")
-
+            content = MessageEnvelope.parse(payload).text or ""
             return content if content.strip() else None
-        except (IndexError, KeyError, AttributeError):
+        except (ValueError, IndexError, KeyError, AttributeError):
             return None
 
+    @staticmethod
+    def record_answer(
+        agent_executor, session_config: SessionConfig, content: str, answer: str
+    ) -> Dict[str, Any]:
+        """Grava no checkpoint um turno respondido sem o agente.
+
+        Assim a próxima mensagem da conversa vê a pergunta e a resposta. A
+        atualização entra como o nó ``agent``, deixando o grafo no fim do
+        turno como depois de um ``invoke``.
+        """
+        messages = [HumanMessage(content=content), AIMessage(content=answer)]
+        agent_executor.update_state(
+            session_config.config_dict, {"messages": messages}, as_node="agent"
+        )
+        return {"messages": messages}
+
     def process_single_message(
-        self, payload: Dict[str, Any], session_config: SessionConfig
+        self,
+        payload: Union[MessageEnvelope, Dict[str, Any]],
+        session_config: SessionConfig,
     ) -> Dict[str, Any]:
-        """Processa uma única mensagem do WhatsApp."""
-        content = self.extract_message_content(payload)
+        """Processa uma única mensagem do WhatsApp.
+
+        Tipos sem texto para o agente são resolvidos antes dele: descartados
+        (``messages`` vazio, nada a publicar) ou respondidos com o padrão.
+        """
+        envelope = MessageEnvelope.parse(payload)
+        preprocessed = preprocess(envelope)
+        if preprocessed.action == MEDIA:
+            # Caminho síncrono: a reivindicação (process_and_publish) já foi feita.
+            preprocessed = preprocess(media_processor.resolve(envelope))
+        if preprocessed.action == DROP:
+            return {"messages": []}
+        if preprocessed.action != AGENT:
+            LLM_CALLS_AVOIDED.inc(
+                route="preprocess", reason=envelope.message_type or "empty"
+            )
+            return {"messages": [AIMessage(content=preprocessed.reply)]}
+
+        content = self.extract_message_content(preprocessed.envelope)
+
+        if INTENT_ROUTER_ENABLED:
+            intent = intent_router.classify(content)
+            if intent:
+                LLM_CALLS_AVOIDED.inc(route="intent_router", reason=intent)
+                return agent_factory.execute_with_agent(
+                    self.record_answer,
+                    session_config,
+                    content,
+                    intent_router.reply(intent),
+                )
+
+        # Sem o grafo do warm-up, ler o histórico compilaria um a cada mensagem.
+        warm_executor = agent_factory.get_warm_executor()
+        if RESPONSE_CACHE_ENABLED and warm_executor is not None:
+            history = []
+            if not is_standalone(normalize_text(content)):
+                # A resposta depende da conversa: a chave inclui as últimas mensagens.
+                history = warm_executor.get_state(
+                    session_config.config_dict
+                ).values.get("messages", [])
+            cached = response_cache.get(session_config.owner_id, content, history)
+            if cached:
+                LLM_CALLS_AVOIDED.inc(route="response_cache", reason="hit")
+                return self.record_answer(
+                    warm_executor, session_config, content, cached
+                )
 
         def _execute_single_chat(agent_executor):
             return agent_executor.invoke(
                 {"messages": [HumanMessage(content=content)]},
-                session_config.config_dict,
+                {**session_config.config_dict, "callbacks": [llm_metrics_callback]},
             )
 
-        return agent_factory.execute_with_agent(_execute_single_chat)
+        result = agent_factory.execute_with_agent(_execute_single_chat)
+
+        if RESPONSE_CACHE_ENABLED and response_cache.is_cacheable(result["messages"]):
+            response_cache.put(
+                session_config.owner_id,
+                content,
+                result["messages"][-1].content,
+                history_before_turn(result["messages"]),
+            )
+        return result
 
 
 class InteractiveChatService:
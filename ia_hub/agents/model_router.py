@@ -0,0 +1,228 @@
+"""Roteamento de modelos por complexidade do turno, com fallback."""
+
+import os
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain.chat_models import init_chat_model
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ..observability.llm_callbacks import ROUTER_LLM_TYPE
+from ..observability.metrics import registry
+from ..scheduling.rate_limiter import owner_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+MODEL_FAST = os.getenv("MODEL_FAST", "gpt-4o-mini")
+MODEL_STRONG = os.getenv("MODEL_STRONG", "gpt-4")
+MODEL_FALLBACKS = [m for m in os.getenv("MODEL_FALLBACKS", "").split(",") if m]
+MODEL_SUMMARY_TIER = os.getenv("MODEL_SUMMARY_TIER", "fast")
+MODEL_TIMEOUT_SECONDS = float(os.getenv("MODEL_TIMEOUT_SECONDS", "60"))
+MODEL_MAX_CONCURRENCY = int(os.getenv("MODEL_MAX_CONCURRENCY", "16"))
+# Tempo máximo esperando uma vaga de concorrência antes de tentar o próximo modelo.
+MODEL_QUEUE_TIMEOUT = float(os.getenv("MODEL_QUEUE_TIMEOUT", "5"))
+# Mensagens do usuário até esse tamanho são consideradas turnos curtos.
+MODEL_SHORT_TURN_CHARS = int(os.getenv("MODEL_SHORT_TURN_CHARS", "160"))
+
+MODEL_FALLBACKS_TOTAL = registry.counter(
+    "ia_hub_llm_fallbacks_total", "Trocas de modelo por timeout, limite ou saturação."
+)
+MODEL_ROUTED_TOTAL = registry.counter(
+    "ia_hub_llm_routed_total", "Chamadas ao LLM por camada escolhida pelo roteador."
+)
+
+try:
+    import openai
+
+    RETRYABLE_ERRORS: tuple = (
+        TimeoutError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+except ImportError:
+    RETRYABLE_ERRORS = (TimeoutError,)
+
+
+@dataclass
+class ModelSpec:
+    """Limites de execução de um modelo."""
+
+    name: str
+    timeout: float = MODEL_TIMEOUT_SECONDS
+    max_concurrency: int = MODEL_MAX_CONCURRENCY
+
+
+def _load_json_env(name: str) -> Dict[str, Any]:
+    raw = os.getenv(name)
+    if not raw:
+        return {}
+    try:
+        return dict(json.loads(raw))
+    except (ValueError, TypeError) as e:
+        logger.warning("%s inválido, ignorando: %s", name, e)
+        return {}
+
+
+class ModelRouter:
+    """Escolhe o modelo de cada chamada e aplica timeout, limite e fallback."""
+
+    def __init__(
+        self,
+        tiers: Dict[str, str],
+        fallbacks: Sequence[str] = (),
+        specs: Optional[Dict[str, ModelSpec]] = None,
+        short_turn_chars: int = MODEL_SHORT_TURN_CHARS,
+    ):
+        self.tiers = tiers
+        self.fallbacks = list(fallbacks)
+        self.specs = specs or {}
+        self.short_turn_chars = short_turn_chars
+        self._models: Dict[str, BaseChatModel] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def get_spec(self, name: str) -> ModelSpec:
+        return self.specs.get(name) or ModelSpec(name=name)
+
+    def get_chat_model(self, name: str) -> BaseChatModel:
+        """Retorna (e guarda) o cliente do modelo com o timeout configurado."""
+        with self._lock:
+            if name not in self._models:
+                spec = self.get_spec(name)
+                # Sem retries internos: o fallback para outro modelo é mais rápido.
+                self._models[name] = init_chat_model(
+                    model=name, timeout=spec.timeout, max_retries=0
+                )
+                self._semaphores[name] = threading.BoundedSemaphore(
+                    spec.max_concurrency
+                )
+            return self._models[name]
+
+    def select_tier(self, messages: Sequence[BaseMessage]) -> str:
+        """Turnos curtos (escolha de ferramenta) vão para o modelo rápido.
+
+        Mensagens longas do usuário e respostas compostas a partir de
+        resultados de ferramentas ficam com o modelo mais forte.
+        """
+        last = messages[-1] if messages else None
+        if isinstance(last, ToolMessage):
+            return "strong"
+        if isinstance(last, HumanMessage):
+            if len(str(last.content)) <= self.short_turn_chars:
+                return "fast"
+        return "strong"
+
+    def candidates(self, tier: str) -> List[str]:
+        """Modelo da camada seguido das alternativas, sem repetição."""
+        ordered = [self.tiers[tier], *self.tiers.values(), *self.fallbacks]
+        return list(dict.fromkeys(ordered))
+
+    def invoke(
+        self,
+        tier: str,
+        messages: Sequence[BaseMessage],
+        tools: Optional[Sequence[Any]] = None,
+        tool_kwargs: Optional[Dict[str, Any]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> BaseMessage:
+        """Executa a chamada no primeiro modelo disponível da camada.
+
+        ``config`` segue para o modelo escolhido (callbacks de tracing e de
+        métricas do run que chamou o roteador).
+        """
+        MODEL_ROUTED_TOTAL.inc(tier=tier)
+        last_error: Optional[BaseException] = None
+
+        for name in self.candidates(tier):
+            model = self.get_chat_model(name)
+            semaphore = self._semaphores[name]
+            if not semaphore.acquire(timeout=MODEL_QUEUE_TIMEOUT):
+                logger.warning("Modelo %s saturado, tentando o próximo.", name)
+                MODEL_FALLBACKS_TOTAL.inc(model=name, reason="saturated")
+                continue
+
+            try:
+                if tools:
+                    model = model.bind_tools(tools, **(tool_kwargs or {}))
+                return model.invoke(messages, config=config, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                logger.warning("Falha no modelo %s (%s), tentando o próximo.", name, e)
+                MODEL_FALLBACKS_TOTAL.inc(model=name, reason=type(e).__name__)
+                last_error = e
+            finally:
+                semaphore.release()
+
+        raise last_error or TimeoutError(f"Nenhum modelo disponível para '{tier}'.")
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model que delega cada chamada ao ModelRouter.
+
+    Com ``tier`` definido usa sempre aquela camada; caso contrário a camada
+    é escolhida a cada chamada a partir das mensagens.
+    """
+
+    router: Any
+    tier: Optional[str] = None
+    tools: Optional[List[Any]] = None
+    tool_kwargs: Dict[str, Any] = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return ROUTER_LLM_TYPE
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tools": list(tools), "tool_kwargs": kwargs})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        tier = self.tier or self.router.select_tier(messages)
+        if run_manager is not None:
+            # Espera pelo token do owner: o escalonador já limita quantas
+            # mensagens do mesmo owner ocupam workers ao mesmo tempo.
+            owner_rate_limiter.acquire("llm", run_manager.metadata.get("owner_id"))
+        message = self.router.invoke(
+            tier,
+            messages,
+            tools=self.tools,
+            tool_kwargs=self.tool_kwargs,
+            # O _agenerate padrão chama este método com o run_manager síncrono,
+            # então o caminho assíncrono também passa os callbacks adiante.
+            config=(
+                {"callbacks": run_manager.get_child()}
+                if run_manager is not None
+                else None
+            ),
+            stop=stop,
+            **kwargs,
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _create_model_router() -> ModelRouter:
+    timeouts = _load_json_env("MODEL_TIMEOUTS")
+    concurrency = _load_json_env("MODEL_CONCURRENCY")
+    specs = {
+        name: ModelSpec(
+            name=name,
+            timeout=float(timeouts.get(name, MODEL_TIMEOUT_SECONDS)),
+            max_concurrency=int(concurrency.get(name, MODEL_MAX_CONCURRENCY)),
+        )
+        for name in {*timeouts, *concurrency}
+    }
+    return ModelRouter(
+        tiers={"fast": MODEL_FAST, "strong": MODEL_STRONG},
+        fallbacks=MODEL_FALLBACKS,
+        specs=specs,
+    )
+
+
+# Instância singleton
+model_router = _create_model_router()
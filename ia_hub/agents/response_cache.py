@@ -0,0 +1,253 @@
+"""Cache de respostas do agente por owner, com correspondência exata e semântica."""
+
+import os
+import re
+import math
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from .intent_router import normalize_text
+from ..database import KNOWLEDGE_UPDATED_CHANNEL, pg_listener
+from ..observability.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+RESPONSE_CACHE_SEMANTIC = (
+    os.getenv("RESPONSE_CACHE_SEMANTIC", "false").lower() == "true"
+)
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95"))
+# Perguntas mais curtas que isso dependem da conversa ("sim", "e para 4?").
+RESPONSE_CACHE_MIN_CHARS = int(os.getenv("RESPONSE_CACHE_MIN_CHARS", "20"))
+# Mensagens anteriores que entram na chave das perguntas que dependem delas.
+RESPONSE_CACHE_CONTEXT_MESSAGES = int(os.getenv("RESPONSE_CACHE_CONTEXT_MESSAGES", "4"))
+
+# Palavras (já normalizadas) que retomam algo dito antes na conversa.
+ANAPHORA_RE = re.compile(
+    r"\b(e|ele|ela|eles|elas|isso|isto|esse|essa|esses|essas|este|esta|aquele|"
+    r"aquela|dele|dela|nele|nela|disso|nisso|mesmo|mesma|sim|nao|ok|tambem|"
+    r"entao|outro|outra|outros|outras|mais|la|ai)\b"
+)
+
+# Respostas que dependem da data atual nunca são reaproveitadas.
+DATE_DEPENDENT_TOOLS = {"date_time_context", "retrieve_availability_and_prices"}
+
+# (owner_id, contexto da conversa, pergunta normalizada)
+CacheKey = Tuple[str, str, str]
+
+
+@dataclass
+class _CacheEntry:
+    answer: str
+    expires_at: float
+    vector: Optional[List[float]] = None
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+
+def is_standalone(normalized: str) -> bool:
+    """Indica se a pergunta (normalizada) se entende sem o resto da conversa."""
+    return len(normalized) >= RESPONSE_CACHE_MIN_CHARS and not ANAPHORA_RE.search(
+        normalized
+    )
+
+
+def history_before_turn(messages: Sequence[BaseMessage]) -> Sequence[BaseMessage]:
+    """Mensagens da conversa anteriores à última mensagem do usuário."""
+    last_human = max(
+        (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+        default=0,
+    )
+    return messages[:last_human]
+
+
+def _conversation(history: Sequence[BaseMessage]) -> List[str]:
+    """Textos normalizados das mensagens do hóspede e do agente no histórico."""
+    return [
+        normalize_text(str(message.content))
+        for message in history
+        if isinstance(message, (HumanMessage, AIMessage)) and message.content
+    ]
+
+
+def context_key(normalized: str, history: Sequence[BaseMessage]) -> str:
+    """Parte da chave que separa respostas que dependem da conversa.
+
+    Perguntas autônomas e conversas novas ficam com a chave vazia e são
+    compartilhadas entre os hóspedes do owner; as demais levam um hash das
+    últimas mensagens, valendo só para a mesma sequência de conversa.
+    """
+    if is_standalone(normalized):
+        return ""
+    recent = _conversation(history)[-RESPONSE_CACHE_CONTEXT_MESSAGES:]
+    if not recent:
+        return ""
+    return hashlib.sha1("\n".join(recent).encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """Cache LRU com TTL de respostas finais do agente, separado por owner_id."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        embeddings=None,
+        similarity: float = RESPONSE_CACHE_SIMILARITY,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.embeddings = embeddings
+        self.similarity = similarity
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_cacheable(messages: Sequence[BaseMessage]) -> bool:
+        """Indica se o turno pode ser reaproveitado.
+
+        Só turnos que terminam em uma resposta de texto e não usaram
+        ferramentas dependentes de data entram no cache.
+        """
+        last_human = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=-1,
+        )
+        turn = messages[last_human + 1 :]
+        if not turn or not isinstance(turn[-1], AIMessage) or turn[-1].tool_calls:
+            return False
+
+        for message in turn:
+            if (
+                isinstance(message, ToolMessage)
+                and message.name in DATE_DEPENDENT_TOOLS
+            ):
+                return False
+            if isinstance(message, AIMessage) and any(
+                call["name"] in DATE_DEPENDENT_TOOLS for call in message.tool_calls
+            ):
+                return False
+        return isinstance(turn[-1].content, str) and bool(turn[-1].content.strip())
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        if self.embeddings is None:
+            return None
+        try:
+            return self.embeddings.embed_query(text)
+        except Exception as e:
+            logger.warning("Falha ao gerar embedding para o cache: %s", e)
+            return None
+
+    def get(
+        self,
+        owner_id: str,
+        message: Optional[str],
+        history: Sequence[BaseMessage] = (),
+    ) -> Optional[str]:
+        """Busca a resposta por correspondência exata e, se ativo, semântica.
+
+        ``history`` são as mensagens anteriores da conversa; só importam para
+        perguntas que não se entendem sozinhas (ver ``context_key``).
+        """
+        if not owner_id or not message:
+            return None
+
+        normalized = normalize_text(message)
+        key = (owner_id, context_key(normalized, history), normalized)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                CACHE_REQUESTS.inc(cache="response", result="hit")
+                return entry.answer
+
+        vector = self._embed(normalized)
+        if vector is not None:
+            with self._lock:
+                candidates = [
+                    (cached_key, cached)
+                    for cached_key, cached in self._entries.items()
+                    if cached_key[:2] == key[:2]
+                    and cached.vector is not None
+                    and cached.expires_at > now
+                ]
+            best = max(
+                candidates,
+                key=lambda item: _cosine(vector, item[1].vector),
+                default=None,
+            )
+            if best and _cosine(vector, best[1].vector) >= self.similarity:
+                CACHE_REQUESTS.inc(cache="response", result="semantic_hit")
+                return best[1].answer
+
+        CACHE_REQUESTS.inc(cache="response", result="miss")
+        return None
+
+    def put(
+        self,
+        owner_id: str,
+        message: Optional[str],
+        answer: str,
+        history: Sequence[BaseMessage] = (),
+    ) -> None:
+        """Guarda a resposta, descartando as entradas mais antigas se cheio.
+
+        A chave de uma pergunta autônoma não tem nada da conversa, então a
+        resposta só é guardada se veio de uma conversa nova: no meio de uma
+        conversa o modelo pode ter usado o nome, as datas ou os hóspedes
+        informados antes, que não valem para os outros hóspedes do owner.
+        """
+        if not owner_id or not message:
+            return
+
+        normalized = normalize_text(message)
+        if is_standalone(normalized) and _conversation(history):
+            return
+        key = (owner_id, context_key(normalized, history), normalized)
+        entry = _CacheEntry(
+            answer=answer,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            vector=self._embed(normalized),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_owner(self, owner_id: str) -> None:
+        """Remove todas as respostas de um owner (ex.: base de conhecimento mudou)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == owner_id]:
+                del self._entries[key]
+        logger.info("Cache de respostas invalidado para owner_id %s", owner_id)
+
+
+def _create_response_cache() -> ResponseCache:
+    embeddings = None
+    if RESPONSE_CACHE_SEMANTIC:
+        from ..knowledge.embeddings import get_embeddings
+
+        # Vetores só em memória: não precisam seguir a dimensão da base.
+        embeddings = get_embeddings("text-embedding-3-small", dimensions=None)
+
+    cache = ResponseCache(embeddings=embeddings)
+    pg_listener.subscribe(KNOWLEDGE_UPDATED_CHANNEL, cache.invalidate_owner)
+    return cache
+
+
+# Instância singleton
+response_cache = _create_response_cache()
@@ -1,40 +1,113 @@
 """Gerenciador de sessões e configurações do agente."""
 
-from typing import Dict, Any
-from dataclasses import dataclass
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
 
+from ..observability.metrics import registry
 
-@dataclass
+# Sessões mantidas em memória; as mais antigas são descartadas primeiro.
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+# Sessões sem atividade por mais tempo que isso são descartadas.
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "3600"))
+
+SESSIONS_ACTIVE = registry.gauge("ia_hub_sessions_active", "Sessões em memória.")
+SESSIONS_EVICTED = registry.counter(
+    "ia_hub_sessions_evicted_total", "Sessões descartadas, por motivo."
+)
+
+
+@dataclass(slots=True)
 class SessionConfig:
-    """Configuração de sessão do agente."""
+    """Configuração de sessão do agente, com contadores de uso."""
 
     thread_id: str
     owner_id: str
+    turn_count: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_activity: float = field(default_factory=time.monotonic)
+    _config_dict: Dict[str, Any] = field(init=False, repr=False, compare=False)
 
-    @property
-    def config_dict(self) -> Dict[str, Any]:
-        """Retorna a configuração como dicionário."""
-        return {
+    def __post_init__(self):
+        self._config_dict = {
             "configurable": {
                 "thread_id": self.thread_id,
                 "owner_id": self.owner_id,
             }
         }
 
+    @property
+    def config_dict(self) -> Dict[str, Any]:
+        """Retorna a configuração como dicionário (compartilhado; não modificar)."""
+        return self._config_dict
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_activity
+
+    def record_turn(self) -> None:
+        """Registra uma mensagem processada na sessão."""
+        self.turn_count += 1
+        self.last_activity = time.monotonic()
+
 
 class SessionManager:
-    """Gerencia sessões ativas do agente."""
+    """Gerencia sessões ativas do agente.
+
+    Registro limitado em ordem de uso (LRU): acessar uma sessão a move para
+    o fim, e o início é descartado quando passa de ``max_entries`` ou fica
+    ocioso por mais de ``idle_seconds``.
+    """
 
-    def __init__(self):
-        self._sessions: Dict[str, SessionConfig] = {}
+    def __init__(
+        self,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        idle_seconds: float = SESSION_IDLE_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.idle_seconds = idle_seconds
+        self._sessions: "OrderedDict[str, SessionConfig]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
 
     def create_session(
         self, thread_id: str = "default_thread", owner_id: str = "default_owner"
     ) -> SessionConfig:
-        """Cria uma nova sessão."""
-        session = SessionConfig(thread_id=thread_id, owner_id=owner_id)
-        self._sessions[thread_id] = session
-        return session
+        """Retorna a sessão da conversa, criando-a se necessário."""
+        with self._lock:
+            session = self._sessions.get(thread_id)
+            if session is None or session.owner_id != owner_id:
+                session = SessionConfig(thread_id=thread_id, owner_id=owner_id)
+                self._sessions[thread_id] = session
+            else:
+                session.last_activity = time.monotonic()
+            self._sessions.move_to_end(thread_id)
+            self._evict()
+            SESSIONS_ACTIVE.set(len(self._sessions))
+            return session
+
+    def get_session(self, thread_id: str) -> Optional[SessionConfig]:
+        """Retorna a sessão da conversa, se ainda estiver em memória."""
+        return self._sessions.get(thread_id)
+
+    def _evict(self) -> None:
+        """Descarta sessões do início do LRU; chamado com o lock adquirido."""
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+            SESSIONS_EVICTED.inc(reason="size")
+
+        deadline = time.monotonic() - self.idle_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_activity >= deadline:
+                break
+            self._sessions.popitem(last=False)
+            SESSIONS_EVICTED.inc(reason="idle")
 
 
 # Instância singleton
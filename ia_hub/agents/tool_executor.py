@@ -0,0 +1,189 @@
+"""Executor paralelo de ferramentas para o grafo ReAct."""
+
+import os
+import json
+import time
+import logging
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import ToolNode
+
+from ..observability.metrics import TOOL_DURATION
+from .tool_outputs import SELF_BUDGETED_TOOLS, fit_budget
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+TOOL_EXECUTOR_MAX_WORKERS = int(os.getenv("TOOL_EXECUTOR_MAX_WORKERS", "8"))
+
+# O scraping do Airbnb soma várias esperas do Selenium e precisa de mais folga.
+DEFAULT_TOOL_TIMEOUTS: Dict[str, float] = {
+    "retrieve_availability_and_prices": 150.0,
+}
+
+
+def _load_tool_timeouts() -> Dict[str, float]:
+    """Lê os timeouts por ferramenta da variável TOOL_TIMEOUTS (JSON)."""
+    timeouts = dict(DEFAULT_TOOL_TIMEOUTS)
+    raw = os.getenv("TOOL_TIMEOUTS")
+    if not raw:
+        return timeouts
+
+    try:
+        timeouts.update({name: float(value) for name, value in json.loads(raw).items()})
+    except (ValueError, AttributeError) as e:
+        logger.warning("TOOL_TIMEOUTS inválido, usando valores padrão: %s", e)
+    return timeouts
+
+
+# Pool único do processo: grafos recriados (warm-up, fakes) não abrem outro.
+# Uma chamada que estoura o timeout continua ocupando seu worker até a
+# ferramenta terminar (threads não podem ser interrompidas); dimensione
+# TOOL_EXECUTOR_MAX_WORKERS contando com o maior timeout de TOOL_TIMEOUTS.
+_tool_pool = ContextThreadPoolExecutor(
+    max_workers=TOOL_EXECUTOR_MAX_WORKERS, thread_name_prefix="tool-executor"
+)
+
+
+class ParallelToolNode(ToolNode):
+    """ToolNode que executa as chamadas de ferramenta em paralelo.
+
+    Cada chamada roda em um pool de threads compartilhado e tem seu próprio
+    timeout; uma ferramenta lenta (como o scraping) não atrasa as demais e,
+    se estourar o limite, vira um ToolMessage de erro para o modelo.
+
+    Sobrescreve ``_func`` e usa ``inject_tool_args`` do ToolNode, que não são
+    API estável: a versão do langgraph está fixada no requirements.txt.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        *,
+        default_timeout: float = DEFAULT_TOOL_TIMEOUT,
+        timeouts: Optional[Dict[str, float]] = None,
+        **kwargs,
+    ):
+        super().__init__(tools, **kwargs)
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts if timeouts is not None else _load_tool_timeouts()
+        self._executor = _tool_pool
+
+    def get_timeout(self, tool_name: str) -> float:
+        """Retorna o timeout configurado para a ferramenta."""
+        return self.timeouts.get(tool_name, self.default_timeout)
+
+    @staticmethod
+    def _get_tool_calls(input: Any) -> List[Dict[str, Any]]:
+        """Extrai as chamadas de ferramenta da última mensagem do modelo."""
+        if isinstance(input, list):
+            messages = input
+        elif isinstance(input, dict):
+            messages = input.get("messages", [])
+        else:
+            messages = getattr(input, "messages", [])
+
+        for message in reversed(messages):
+            if isinstance(message, AIMessage):
+                return list(message.tool_calls)
+        raise ValueError(
+            "Nenhuma AIMessage encontrada na entrada do nó de ferramentas."
+        )
+
+    def _run_timed(self, call: Dict[str, Any], config: RunnableConfig) -> ToolMessage:
+        """Executa uma chamada de ferramenta registrando o tempo gasto."""
+        started = time.perf_counter()
+        tool = self.tools_by_name.get(call["name"])
+        status = "ok"
+        try:
+            if tool is None:
+                status = "error"
+                return ToolMessage(
+                    content=f"Erro: ferramenta '{call['name']}' não existe.",
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                    status="error",
+                )
+            output = tool.invoke({**call, "type": "tool_call"}, config)
+            if not isinstance(output, ToolMessage):
+                output = ToolMessage(
+                    content=str(output),
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                )
+            if call["name"] not in SELF_BUDGETED_TOOLS and isinstance(
+                output.content, str
+            ):
+                # Com um ToolCall o invoke já devolve o ToolMessage pronto;
+                # só o conteúdo é cortado, o id e o status ficam.
+                output = output.model_copy(
+                    update={"content": fit_budget(call["name"], output.content)}
+                )
+            if output.status == "error":
+                status = "error"
+            return output
+        except Exception as e:
+            status = "error"
+            logger.exception("Erro ao executar a ferramenta %s", call["name"])
+            return ToolMessage(
+                content=f"Erro: {e!r}",
+                name=call["name"],
+                tool_call_id=call["id"],
+                status="error",
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            TOOL_DURATION.observe(elapsed, tool=call["name"], status=status)
+            logger.info(
+                "Ferramenta %s executada em %.1f ms", call["name"], elapsed * 1000
+            )
+
+    def _func(self, input: Any, config: RunnableConfig, *, store=None) -> Any:
+        tool_calls = [
+            self.inject_tool_args(call, input, store)
+            for call in self._get_tool_calls(input)
+        ]
+
+        started = time.monotonic()
+        futures = [
+            (call, self._executor.submit(self._run_timed, call, config))
+            for call in tool_calls
+        ]
+
+        outputs = []
+        for call, future in futures:
+            deadline = started + self.get_timeout(call["name"])
+            try:
+                outputs.append(
+                    future.result(timeout=max(0.0, deadline - time.monotonic()))
+                )
+            except FutureTimeoutError:
+                # A thread continua rodando até terminar, mas o grafo segue em frente.
+                logger.warning(
+                    "Timeout de %.0fs na ferramenta %s",
+                    self.get_timeout(call["name"]),
+                    call["name"],
+                )
+                outputs.append(
+                    ToolMessage(
+                        content=(
+                            f"Erro: a ferramenta '{call['name']}' excedeu o tempo "
+                            "limite. Tente novamente mais tarde."
+                        ),
+                        name=call["name"],
+                        tool_call_id=call["id"],
+                        status="error",
+                    )
+                )
+
+        return {"messages": outputs}
+
+
+def get_tool_executor(tools: Sequence[BaseTool]) -> ParallelToolNode:
+    """Cria o nó de ferramentas paralelo com a configuração do ambiente."""
+    return ParallelToolNode(tools)
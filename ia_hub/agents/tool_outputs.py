@@ -0,0 +1,188 @@
+"""Saídas compactas das ferramentas, com orçamento de tokens por ferramenta.
+
+O resultado de uma ferramenta vira um ToolMessage que é reenviado em todo
+prompt seguinte da conversa, gravado no checkpoint e lido pelo resumo. Por
+isso as ferramentas devolvem JSON enxuto (preço em número, disponibilidade
+como booleano, trechos aparados) em vez de texto formatado ou objetos
+``Document`` serializados.
+"""
+
+import os
+import re
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..airbnb.availability_calendar import format_room_text, parse_brl
+from ..observability.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Mesma estimativa de count_tokens_approximately (~4 caracteres por token).
+CHARS_PER_TOKEN = 4
+DEFAULT_TOOL_TOKEN_BUDGET = int(os.getenv("TOOL_TOKEN_BUDGET", "300"))
+
+AVAILABILITY_TOOL = "retrieve_availability_and_prices"
+KNOWLEDGE_TOOL = "look_for_information_that_i_don_t_know"
+
+DEFAULT_TOOL_TOKEN_BUDGETS: Dict[str, int] = {
+    AVAILABILITY_TOOL: 120,
+    KNOWLEDGE_TOOL: 400,
+}
+
+# Ferramentas que já respeitam o orçamento sem cortar o JSON; o executor não
+# deve cortá-las de novo.
+SELF_BUDGETED_TOOLS = frozenset({AVAILABILITY_TOOL, KNOWLEDGE_TOOL})
+
+# Limites dos campos de texto livre, em caracteres.
+TITLE_MAX_CHARS = 80
+REASON_MAX_CHARS = 120
+
+TOOL_OUTPUT_TOKENS = registry.counter(
+    "ia_hub_tool_output_tokens_total",
+    "Tokens estimados das saídas das ferramentas, no formato antigo e no compacto.",
+)
+TOOL_TOKENS_SAVED = registry.counter(
+    "ia_hub_tool_tokens_saved_total",
+    "Tokens de prompt economizados pelas saídas compactas, por ferramenta.",
+)
+TOOL_OUTPUT_TRUNCATED = registry.counter(
+    "ia_hub_tool_output_truncated_total",
+    "Saídas de ferramenta cortadas por passar do orçamento de tokens.",
+)
+
+
+def _load_tool_token_budgets() -> Dict[str, int]:
+    """Lê os orçamentos por ferramenta da variável TOOL_TOKEN_BUDGETS (JSON)."""
+    budgets = dict(DEFAULT_TOOL_TOKEN_BUDGETS)
+    raw = os.getenv("TOOL_TOKEN_BUDGETS")
+    if not raw:
+        return budgets
+
+    try:
+        budgets.update({name: int(value) for name, value in json.loads(raw).items()})
+    except (ValueError, AttributeError) as e:
+        logger.warning("TOOL_TOKEN_BUDGETS inválido, usando valores padrão: %s", e)
+    return budgets
+
+
+TOOL_TOKEN_BUDGETS = _load_tool_token_budgets()
+
+
+def get_budget(tool_name: str) -> int:
+    """Retorna o orçamento de tokens da ferramenta."""
+    return TOOL_TOKEN_BUDGETS.get(tool_name, DEFAULT_TOOL_TOKEN_BUDGET)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def _trim(text: Optional[str], max_chars: int) -> Optional[str]:
+    """Junta os espaços e corta o texto em ``max_chars`` caracteres."""
+    if not text:
+        return None
+    text = re.sub(r"\s+", " ", str(text)).strip()
+    if len(text) <= max_chars:
+        return text
+    return text[: max_chars - 1].rstrip() + "…"
+
+
+def fit_budget(tool_name: str, content: str) -> str:
+    """Corta a saída de texto livre que passar do orçamento da ferramenta."""
+    max_chars = get_budget(tool_name) * CHARS_PER_TOKEN
+    if len(content) <= max_chars:
+        return content
+    TOOL_OUTPUT_TRUNCATED.inc(tool=tool_name)
+    return content[: max_chars - 1] + "…"
+
+
+def _fit_items(tool_name: str, key: str, items: List[Any]) -> str:
+    """Serializa ``{key: items}`` dentro do orçamento descartando itens inteiros.
+
+    Os últimos itens saem primeiro e ``omitidos`` diz quantos; o JSON nunca
+    é cortado. O primeiro item fica mesmo que sozinho passe do orçamento.
+    """
+    max_chars = get_budget(tool_name) * CHARS_PER_TOKEN
+    kept = list(items)
+    content = _dumps({key: kept})
+    while len(content) > max_chars and len(kept) > 1:
+        kept.pop()
+        content = _dumps({key: kept, "omitidos": len(items) - len(kept)})
+    if len(kept) < len(items):
+        TOOL_OUTPUT_TRUNCATED.inc(tool=tool_name)
+    return content
+
+
+def _record(tool_name: str, raw: str, compact: str) -> None:
+    raw_tokens = estimate_tokens(raw)
+    compact_tokens = estimate_tokens(compact)
+    TOOL_OUTPUT_TOKENS.inc(raw_tokens, tool=tool_name, format="raw")
+    TOOL_OUTPUT_TOKENS.inc(compact_tokens, tool=tool_name, format="compact")
+    TOOL_TOKENS_SAVED.inc(max(raw_tokens - compact_tokens, 0), tool=tool_name)
+
+
+def compact_room(room: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduz o resultado de um quarto aos campos que o modelo usa."""
+    if room.get("erro"):
+        return {"erro": _trim(room["erro"], REASON_MAX_CHARS)}
+
+    titulo = room.get("titulo")
+    if titulo and titulo.startswith("⚠️"):
+        titulo = None
+
+    compact = {
+        "titulo": _trim(titulo, TITLE_MAX_CHARS),
+        "disponivel": bool(room.get("disponivel")),
+        "total_brl": parse_brl(room.get("preco_total")),
+        "diaria_brl": parse_brl(room.get("diaria")),
+    }
+    if not compact["disponivel"]:
+        # A mensagem vem do innerText da página: só a primeira linha importa.
+        motivo = (room.get("mensagem_indisponivel") or "").strip().split("\n")[0]
+        compact["motivo"] = _trim(motivo, REASON_MAX_CHARS)
+    if room.get("taxas_incluidas") is False:
+        compact["taxas_incluidas"] = False
+    return {key: value for key, value in compact.items() if value is not None}
+
+
+def availability_output(rooms: List[Dict[str, Any]]) -> str:
+    """Saída de ``retrieve_availability_and_prices`` para a lista de quartos."""
+    compact = _fit_items(
+        AVAILABILITY_TOOL, "quartos", [compact_room(room) for room in rooms]
+    )
+    _record(
+        AVAILABILITY_TOOL,
+        "\n\n".join(format_room_text(room) for room in rooms),
+        compact,
+    )
+    return compact
+
+
+def knowledge_output(documents: Iterable[Any]) -> str:
+    """Saída de ``look_for_information_that_i_don_t_know``: só os trechos.
+
+    O orçamento é dividido entre os trechos antes de serializar, para que
+    cada trecho seja aparado em vez de o JSON ficar cortado no meio.
+    """
+    tool_name = KNOWLEDGE_TOOL
+    documents = list(documents)
+    overhead = len(_dumps({"trechos": [""] * len(documents)}))
+    per_passage = max(
+        (get_budget(tool_name) * CHARS_PER_TOKEN - overhead) // max(len(documents), 1),
+        1,
+    )
+    passages = [
+        _trim(getattr(document, "page_content", document), per_passage)
+        for document in documents
+    ]
+    # O escape de aspas e barras pode passar um pouco da divisão acima.
+    compact = _fit_items(
+        tool_name, "trechos", [passage for passage in passages if passage]
+    )
+    _record(tool_name, str(documents), compact)
+    return compact
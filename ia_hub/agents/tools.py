@@ -1,4 +1,5 @@
-import os
+import sys
+import threading
 from datetime import date
 from typing import Annotated
 from zoneinfo import ZoneInfo
@@ -6,11 +7,50 @@ from datetime import datetime
 from langchain_core.tools import tool
 from langgraph.graph import MessagesState
 from langgraph.prebuilt import InjectedState
-from langchain_openai import OpenAIEmbeddings
 from langchain_core.runnables import RunnableConfig
-from langchain_postgres.vectorstores import PGVector
 
-from ..airbnb.airbnb_scrapper import initialize_airbnb_scraper
+from ..airbnb.availability_calendar import CALENDAR_ENABLED, availability_calendar
+from ..observability import span
+from ..observability.metrics import CACHE_REQUESTS
+from .tool_outputs import availability_output, knowledge_output
+
+# Selenium e a base de conhecimento só são carregados no primeiro uso, para
+# não pesarem na importação do consumer.
+_vector_store = None
+_vector_store_lock = threading.Lock()
+
+
+def scrape_rooms(**kwargs):
+    """Carrega o scraper do Airbnb na primeira consulta e executa o scraping."""
+    from ..airbnb.airbnb_scrapper import scrape_rooms as scrape
+
+    return scrape(**kwargs)
+
+
+def warm_up_scraper():
+    """Prepara o scraper (chromedriver) antes da primeira consulta."""
+    from ..airbnb.airbnb_scrapper import warm_up
+
+    warm_up()
+
+
+def shutdown_scrapers():
+    """Fecha os navegadores abertos, se o scraper chegou a ser carregado."""
+    scraper = sys.modules.get("ia_hub.airbnb.airbnb_scrapper")
+    if scraper is not None:
+        scraper.shutdown_scrapers()
+
+
+def get_vector_store():
+    """Retorna o PGVector da base de conhecimento, criado uma vez por processo."""
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                from ..knowledge.knowledge_manager import create_vector_store
+
+                _vector_store = create_vector_store()
+    return _vector_store
 
 
 @tool()
@@ -34,23 +74,35 @@ def retrieve_availability_and_prices(
         state (MessagesState): The current state of messages, used for context.
 
     Returns:
-        str: A formatted string containing availability status and price details
-             for the given date range and guest configuration.
+        str: Compact JSON with one entry per room: title, availability (bool),
+             total and nightly price in BRL (numbers) and, when unavailable,
+             the reason.
     """
-    return initialize_airbnb_scraper(
+    if CALENDAR_ENABLED:
+        owner_id = (config.get("metadata") or {}).get("owner_id")
+        with span("calendar.lookup"):
+            answer = availability_calendar.lookup(owner_id, check_in, check_out, guests)
+        CACHE_REQUESTS.inc(
+            cache="availability_calendar", result="hit" if answer else "miss"
+        )
+        if answer:
+            return availability_output(answer)
+
+    rooms = scrape_rooms(
         check_in=check_in.strftime("%Y-%m-%d"),
         check_out=check_out.strftime("%Y-%m-%d"),
         adults=adults,
         guests=guests,
         config=config,
     )
+    return availability_output(rooms)
 
 
 @tool()
 def look_for_information_that_i_don_t_know(
     raw_input: str,
     config: RunnableConfig,
-) -> list:
+) -> str:
     """
     Searches the knowledge base for information not currently known to the agent.
 
@@ -59,16 +111,12 @@ def look_for_information_that_i_don_t_know(
         config (RunnableConfig): Configuration for the tool's execution context.
 
     Returns:
-        list: A list of relevant information entries retrieved from the knowledge base.
+        str: Compact JSON with the relevant passages from the knowledge base.
     """
     metadata = config.get("metadata", {})
     owner_id = metadata.get("owner_id")
 
-    vector_store = PGVector(
-        embeddings=OpenAIEmbeddings(model="text-embedding-3-large"),
-        connection=os.getenv("POSTGRES_URL", ""),
-        use_jsonb=True,
-    )
+    vector_store = get_vector_store()
 
     print(f"Searching for: {raw_input} with owner_id: {owner_id}")
 
@@ -80,7 +128,7 @@ def look_for_information_that_i_don_t_know(
         },
     )
 
-    return results
+    return knowledge_output(results)
 
 
 @tool()
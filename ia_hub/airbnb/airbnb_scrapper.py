@@ -3,8 +3,10 @@ import os
 import time
 import logging
 import tempfile
+import threading
+import functools
+import contextlib
 
-import psycopg2
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
@@ -18,6 +20,10 @@ from selenium.common.exceptions import (
     WebDriverException,
 )
 
+from ..observability import span
+from ..scheduling.rate_limiter import owner_rate_limiter
+from .rooms_cache import rooms_cache
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -27,12 +33,107 @@ logger = logging.getLogger(__name__)
 # Variável de ambiente para o ambiente de execução (local ou produção)
 ENV = os.getenv("ENV", "local")
 
+# Drivers em uso, para que o encerramento do consumer possa fechá-los.
+_active_drivers = set()
+_active_drivers_lock = threading.Lock()
+
+# Tempo máximo esperando o limite de scraping do owner antes de desistir.
+SCRAPE_RATE_LIMIT_WAIT = float(os.getenv("SCRAPE_RATE_LIMIT_WAIT", "20"))
+
+CHROMEDRIVER_VERSION = os.getenv("CHROMEDRIVER_VERSION", "137.0.7151.55")
+# Abre e fecha um navegador no warm-up, trazendo o Chrome para o cache do disco.
+SCRAPER_WARM_BROWSER = os.getenv("SCRAPER_WARM_BROWSER", "false").lower() == "true"
+
+# Perfil de renderização: "lean" bloqueia o que não é necessário para ler
+# título, preço e disponibilidade; "full" carrega a página inteira.
+SCRAPER_RENDER_PROFILE = os.getenv("SCRAPER_RENDER_PROFILE", "lean")
+SCRAPER_WINDOW_SIZE = os.getenv("SCRAPER_WINDOW_SIZE", "1024,768")
+
+# Padrões do Network.setBlockedURLs: mídia, fontes e rastreadores de terceiros.
+# Os scripts e as chamadas de API do Airbnb continuam liberados.
+DEFAULT_BLOCKED_URLS = [
+    "*.jpg",
+    "*.jpeg",
+    "*.png",
+    "*.gif",
+    "*.webp",
+    "*.avif",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.mp4",
+    "*.webm",
+    "*.m3u8",
+    "*/im/pictures/*",
+    "*maps.googleapis.com*",
+    "*maps.gstatic.com*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*connect.facebook.com*",
+    "*bat.bing.com*",
+    "*hotjar.com*",
+]
+SCRAPER_BLOCKED_URLS = [
+    pattern.strip()
+    for pattern in os.getenv(
+        "SCRAPER_BLOCKED_URLS", ",".join(DEFAULT_BLOCKED_URLS)
+    ).split(",")
+    if pattern.strip()
+]
+
+
+def apply_render_profile(options, profile):
+    """
+    Ajusta as opções do Chrome ao perfil: no "lean", sem imagens, janela
+    pequena e sem esperar todos os subrecursos (page load "eager").
+    """
+    if profile != "lean":
+        return
+    options.page_load_strategy = "eager"
+    options.add_argument(f"--window-size={SCRAPER_WINDOW_SIZE}")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option(
+        "prefs", {"profile.managed_default_content_settings.images": 2}
+    )
+
 
-def __setup_driver():
+def apply_network_blocking(driver, profile, blocked_urls=None):
+    """
+    Bloqueia, via Chrome DevTools, as URLs não essenciais no perfil "lean".
+    """
+    if profile != "lean":
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd(
+        "Network.setBlockedURLs",
+        {"urls": SCRAPER_BLOCKED_URLS if blocked_urls is None else blocked_urls},
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_chromedriver_path():
+    """
+    Resolve o caminho do chromedriver uma única vez por processo.
+    O webdriver_manager consulta a rede a cada install(); CHROMEDRIVER_PATH
+    evita até a primeira consulta.
+    """
+    return (
+        os.getenv("CHROMEDRIVER_PATH")
+        or ChromeDriverManager(driver_version=CHROMEDRIVER_VERSION).install()
+    )
+
+
+def __setup_driver(profile=None):
     """
     Configura e inicializa o driver do Chrome para Selenium.
-    Adapta a configuração com base no ambiente (local ou produção).
+    Adapta a configuração com base no ambiente (local ou produção) e no
+    perfil de renderização (SCRAPER_RENDER_PROFILE por padrão).
     """
+    profile = profile or SCRAPER_RENDER_PROFILE
     try:
         logger.info("Configurando o driver do Chrome...")
 
@@ -54,16 +155,21 @@ def __setup_driver():
         options.add_argument("--headless=new")
         options.add_argument("--disable-extensions")
         options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--remote-debugging-port=9222")
+        # Porta 0: cada Chrome escolhe a sua, sem conflito entre scrapes paralelos.
+        options.add_argument("--remote-debugging-port=0")
         options.add_argument(f"--user-data-dir={temp_user_data_dir}")
         options.add_argument("--disable-blink-features=AutomationControlled")
+        apply_render_profile(options, profile)
 
-        service = Service(ChromeDriverManager(driver_version="137.0.7151.55").install())
-        driver = webdriver.Chrome(service=service, options=options)
+        with span("scraper.browser_start"):
+            service = Service(get_chromedriver_path())
+            driver = webdriver.Chrome(service=service, options=options)
+            apply_network_blocking(driver, profile)
 
         logger.info(
-            "Driver do Chrome configurado com sucesso. Usando Chrome em %s",
+            "Driver do Chrome configurado com sucesso. Usando Chrome em %s (perfil %s)",
             options.binary_location,
+            profile,
         )
         return driver
     except WebDriverException as e:
@@ -139,143 +245,157 @@ def __extrair_preco_total(driver):
     time.sleep(3)  # Pequeno delay para renderização após o scroll
 
     # Estratégia 1: Tentar encontrar o preço total por data-testid (comum no Airbnb)
-    logger.info("Tentando encontrar preço por data-testid='book-it-total-price'...")
-    try:
-        # Espera por até 20 segundos pelo elemento do preço total
-        preco_element = WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, '[data-testid="book-it-total-price"]')
+    with span("scraper.price_strategy", strategy="data-testid"):
+        logger.info("Tentando encontrar preço por data-testid='book-it-total-price'...")
+        try:
+            # Espera por até 20 segundos pelo elemento do preço total
+            preco_element = WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, '[data-testid="book-it-total-price"]')
+                )
             )
-        )
-        preco_total = preco_element.text.strip()
-        if preco_total:
-            logger.info("✅ Preço total encontrado por data-testid: %s", preco_total)
-            return preco_total
-    except TimeoutException:
-        logger.warning("Timeout esperando por data-testid='book-it-total-price'.")
-    except NoSuchElementException:
-        logger.warning("Elemento com data-testid='book-it-total-price' não encontrado.")
-    except Exception as e:
-        logger.warning("Erro ao tentar encontrar preço por data-testid: %s", e)
+            preco_total = preco_element.text.strip()
+            if preco_total:
+                logger.info(
+                    "✅ Preço total encontrado por data-testid: %s", preco_total
+                )
+                return preco_total
+        except TimeoutException:
+            logger.warning("Timeout esperando por data-testid='book-it-total-price'.")
+        except NoSuchElementException:
+            logger.warning(
+                "Elemento com data-testid='book-it-total-price' não encontrado."
+            )
+        except Exception as e:
+            logger.warning("Erro ao tentar encontrar preço por data-testid: %s", e)
 
     # Estratégia 2: Buscar por elementos com "R$" e palavras-chave como "Total", "noites", "diária"
-    logger.info(
-        "Tentando encontrar preço por XPATH genérico com 'R$' e palavras-chave..."
-    )
-    try:
-        # Espera por até 15 segundos por qualquer elemento que contenha "R$"
-        elementos_com_rs = WebDriverWait(driver, 15).until(
-            EC.presence_of_all_elements_located(
-                (By.XPATH, "//*[contains(text(),'R$')]")
-            )
+    with span("scraper.price_strategy", strategy="xpath"):
+        logger.info(
+            "Tentando encontrar preço por XPATH genérico com 'R$' e palavras-chave..."
         )
-        logger.debug("Encontrados %d elementos com 'R$'.", len(elementos_com_rs))
-
-        for elem in elementos_com_rs:
-            texto = elem.text.strip()
-            textos_debug.append(texto)  # Adiciona para debug final
-            logger.debug("Analisando elemento com texto: '%s'", texto)
-
-            # Prioriza elementos que contenham "Total", "noite" ou "diária"
-            if (
-                "Total" in texto
-                or "total" in texto
-                or "noite" in texto
-                or "diária" in texto
-            ):
-                # Verifica se o texto contém um valor numérico válido após "R$"
-                if "R$" in texto:
-                    # Regex para extrair o valor numérico (incluindo vírgula para decimal)
-
-                    match = re.search(r"R\$\s*([\d\.,]+)", texto)
-                    if match:
-                        extracted_price = (
-                            match.group(1).replace(".", "").replace(",", ".")
-                        )  # Converte para formato numérico
-                        try:
-                            float(
-                                extracted_price
-                            )  # Tenta converter para float para validar
-                            preco_total = texto
-                            logger.info(
-                                "✅ Preço total encontrado por XPATH com palavra-chave: %s",
-                                preco_total,
-                            )
-                            return preco_total
-                        except ValueError:
+        try:
+            # Espera por até 15 segundos por qualquer elemento que contenha "R$"
+            elementos_com_rs = WebDriverWait(driver, 15).until(
+                EC.presence_of_all_elements_located(
+                    (By.XPATH, "//*[contains(text(),'R$')]")
+                )
+            )
+            logger.debug("Encontrados %d elementos com 'R$'.", len(elementos_com_rs))
+
+            for elem in elementos_com_rs:
+                texto = elem.text.strip()
+                textos_debug.append(texto)  # Adiciona para debug final
+                logger.debug("Analisando elemento com texto: '%s'", texto)
+
+                # Prioriza elementos que contenham "Total", "noite" ou "diária"
+                if (
+                    "Total" in texto
+                    or "total" in texto
+                    or "noite" in texto
+                    or "diária" in texto
+                ):
+                    # Verifica se o texto contém um valor numérico válido após "R$"
+                    if "R$" in texto:
+                        # Regex para extrair o valor numérico (incluindo vírgula para decimal)
+
+                        match = re.search(r"R\$\s*([\d\.,]+)", texto)
+                        if match:
+                            extracted_price = (
+                                match.group(1).replace(".", "").replace(",", ".")
+                            )  # Converte para formato numérico
+                            try:
+                                float(
+                                    extracted_price
+                                )  # Tenta converter para float para validar
+                                preco_total = texto
+                                logger.info(
+                                    "✅ Preço total encontrado por XPATH com palavra-chave: %s",
+                                    preco_total,
+                                )
+                                return preco_total
+                            except ValueError:
+                                logger.debug(
+                                    "Texto '%s' contém R$ mas o valor não é numérico válido.",
+                                    texto,
+                                )
+                        else:
                             logger.debug(
-                                "Texto '%s' contém R$ mas o valor não é numérico válido.",
+                                "Texto '%s' contém R$ mas não foi possível extrair o valor numérico.",
                                 texto,
                             )
-                    else:
-                        logger.debug(
-                            "Texto '%s' contém R$ mas não foi possível extrair o valor numérico.",
-                            texto,
-                        )
-            else:
-                logger.debug(
-                    "Texto '%s' não contém palavras-chave de preço total.", texto
-                )
+                else:
+                    logger.debug(
+                        "Texto '%s' não contém palavras-chave de preço total.", texto
+                    )
 
-    except TimeoutException:
-        logger.warning("Timeout esperando por elementos com 'R$'.")
-    except NoSuchElementException:
-        logger.warning("Nenhum elemento com 'R$' encontrado.")
-    except Exception as e:
-        logger.warning("Erro ao tentar encontrar preço por XPATH genérico: %s", e)
+        except TimeoutException:
+            logger.warning("Timeout esperando por elementos com 'R$'.")
+        except NoSuchElementException:
+            logger.warning("Nenhum elemento com 'R$' encontrado.")
+        except Exception as e:
+            logger.warning("Erro ao tentar encontrar preço por XPATH genérico: %s", e)
 
     # Estratégia 3: Buscar por aria-label ou outros data-atributos genéricos para preço/valor
-    logger.info(
-        "Tentando encontrar preço por aria-label ou data-atributos genéricos..."
-    )
-    try:
-        # Busca por elementos com aria-label que contenham "preço" ou "valor"
-        preco_aria = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, '[aria-label*="preço"], [aria-label*="valor"]')
-            )
+    with span("scraper.price_strategy", strategy="aria-label"):
+        logger.info(
+            "Tentando encontrar preço por aria-label ou data-atributos genéricos..."
         )
-        preco_total = preco_aria.text.strip()
-        if preco_total:
-            logger.info("✅ Preço alternativo encontrado (aria-label): %s", preco_total)
-            return preco_total
-    except TimeoutException:
-        logger.warning("Timeout esperando por aria-label='preço'/'valor'.")
-    except NoSuchElementException:
-        logger.warning("Nenhum elemento com aria-label='preço'/'valor' encontrado.")
-    except Exception as e:
-        logger.warning("Erro ao tentar encontrar preço por aria-label: %s", e)
+        try:
+            # Busca por elementos com aria-label que contenham "preço" ou "valor"
+            preco_aria = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, '[aria-label*="preço"], [aria-label*="valor"]')
+                )
+            )
+            preco_total = preco_aria.text.strip()
+            if preco_total:
+                logger.info(
+                    "✅ Preço alternativo encontrado (aria-label): %s", preco_total
+                )
+                return preco_total
+        except TimeoutException:
+            logger.warning("Timeout esperando por aria-label='preço'/'valor'.")
+        except NoSuchElementException:
+            logger.warning("Nenhum elemento com aria-label='preço'/'valor' encontrado.")
+        except Exception as e:
+            logger.warning("Erro ao tentar encontrar preço por aria-label: %s", e)
 
     # Estratégia 4: Tentar extrair preço via JavaScript (incluindo shadow DOM)
-    logger.info("Tentando extrair preço via JavaScript (shadow DOM)...")
-    try:
-        js_code = """
-        function getPriceFromShadowRoots() {
-            let price = null;
-            // Busca todos os elementos que podem conter shadow roots
-            const allElems = document.querySelectorAll('*');
-            for (const elem of allElems) {
-                if (elem.shadowRoot) {
-                    // Busca por qualquer texto com R$ dentro do shadow root
-                    const matches = elem.shadowRoot.querySelectorAll('*');
-                    for (const match of matches) {
-                        if (match.innerText && match.innerText.includes('R$')) {
-                            price = match.innerText;
-                            if (price) return price;
+    with span("scraper.price_strategy", strategy="shadow-dom"):
+        logger.info("Tentando extrair preço via JavaScript (shadow DOM)...")
+        try:
+            js_code = """
+            function getPriceFromShadowRoots() {
+                let price = null;
+                // Busca todos os elementos que podem conter shadow roots
+                const allElems = document.querySelectorAll('*');
+                for (const elem of allElems) {
+                    if (elem.shadowRoot) {
+                        // Busca por qualquer texto com R$ dentro do shadow root
+                        const matches = elem.shadowRoot.querySelectorAll('*');
+                        for (const match of matches) {
+                            if (match.innerText && match.innerText.includes('R$')) {
+                                price = match.innerText;
+                                if (price) return price;
+                            }
                         }
                     }
                 }
+                return price;
             }
-            return price;
-        }
-        return getPriceFromShadowRoots();
-        """
-        preco_js = driver.execute_script(js_code)
-        if preco_js:
-            logger.info("✅ Preço encontrado via JavaScript/shadow DOM: %s", preco_js)
-            return preco_js
-    except Exception as e:
-        logger.warning("Erro ao tentar extrair preço via JavaScript/shadow DOM: %s", e)
+            return getPriceFromShadowRoots();
+            """
+            preco_js = driver.execute_script(js_code)
+            if preco_js:
+                logger.info(
+                    "✅ Preço encontrado via JavaScript/shadow DOM: %s", preco_js
+                )
+                return preco_js
+        except Exception as e:
+            logger.warning(
+                "Erro ao tentar extrair preço via JavaScript/shadow DOM: %s", e
+            )
 
     logger.warning(
         "[DEBUG] Nenhum preço encontrado após todas as estratégias. Textos de elementos com 'R$' analisados: %s",
@@ -372,7 +492,7 @@ def __scroll_until_price_or_timeout(driver, timeout=30):
 
 def __get_rooms_ids(config):
     """
-    Obtém os IDs dos quartos do banco de dados com base no owner_id da configuração.
+    Obtém os IDs dos quartos do cache de quartos com base no owner_id da configuração.
     """
     logger.info("Obtendo ID do quarto a partir da configuração...")
 
@@ -393,14 +513,8 @@ def __get_rooms_ids(config):
             logger.error("❌ Variável de ambiente POSTGRES_URL não definida.")
             raise ValueError("POSTGRES_URL não definida.")
 
-        conn = psycopg2.connect(postgres_url)
-        cur = conn.cursor()
-        cur.execute("SELECT id FROM rooms WHERE owner_id = %s LIMIT 1", (owner_id,))
-        result = cur.fetchall()
-        cur.close()
-        conn.close()
-
-        ids = [row[0] for row in result]
+        # Um quarto por owner, vindo do cache em memória (sem ida ao banco).
+        ids = rooms_cache.room_ids(str(owner_id), limit=1)
 
         if ids:
             logger.info("Rooms ids encontrados para owner_id %s: %s", owner_id, ids)
@@ -415,25 +529,35 @@ def __get_rooms_ids(config):
         ) from e
 
 
-def __process_each_room_id(
-    driver,
-    room_id,
-    check_in,
-    check_out,
-    guests,
-    adults,
-):
+def __extrair_diaria(driver):
     """
-    Processa um único ID de quarto, acessando a URL do Airbnb e extraindo informações.
+    Extrai o valor da diária do detalhamento do preço ("R$ 300 x 2 noites").
+    Retorna o texto do valor (ex.: "R$ 300") ou None.
     """
     try:
-        url = (
-            f"https://www.airbnb.com.br/rooms/{room_id}?"
-            f"check_in={check_in}&check_out={check_out}"
-            f"&adults={adults}&guests={guests}"
-        )
+        texto = driver.find_element(By.TAG_NAME, "body").text
+    except Exception as e:
+        logger.warning("Erro ao ler o texto da página para a diária: %s", e)
+        return None
+    match = re.search(r"(R\$\s*[\d\.]+(?:,\d{2})?)\s*x\s*\d+\s*noites?", texto)
+    return match.group(1) if match else None
 
-        logger.info("Acessando URL: %s", url)
+
+def scrape_room(driver, room_id, check_in, check_out, guests, adults):
+    """
+    Acessa o anúncio com as datas e hóspedes e extrai os dados estruturados.
+
+    Retorna um dict com titulo, preco_total, diaria, disponivel e
+    mensagem_indisponivel, ou None se a página não carregou.
+    """
+    url = (
+        f"https://www.airbnb.com.br/rooms/{room_id}?"
+        f"check_in={check_in}&check_out={check_out}"
+        f"&adults={adults}&guests={guests}"
+    )
+
+    logger.info("Acessando URL: %s", url)
+    with span("scraper.page_load"):
         driver.get(url)
 
         # Espera pelo carregamento inicial da página (pode ser o título ou um elemento genérico)
@@ -448,32 +572,131 @@ def __process_each_room_id(
             logger.error(
                 "Timeout ao esperar pelo corpo da página. A página pode não ter carregado corretamente."
             )
-            return "❌ Erro: Página não carregou completamente."
+            return None
 
-        # Rola a página até encontrar o preço ou atingir o timeout
+    # Rola a página até encontrar o preço ou atingir o timeout
+    with span("scraper.scroll"):
         __scroll_until_price_or_timeout(driver)
 
-        titulo = __extrair_titulo(driver)
-        preco_total = __extrair_preco_total(driver)
-        disponivel, mensagem_indisponivel = __verificar_disponibilidade(driver)
+    titulo = __extrair_titulo(driver)
+    preco_total = __extrair_preco_total(driver)
+    disponivel, mensagem_indisponivel = __verificar_disponibilidade(driver)
+
+    return {
+        "titulo": titulo,
+        "preco_total": preco_total,
+        "diaria": __extrair_diaria(driver),
+        "disponivel": disponivel,
+        "mensagem_indisponivel": mensagem_indisponivel,
+    }
+
+
+# Busca o calendário pela mesma API que a página do anúncio usa: reaproveita
+# a URL (com o hash da consulta) que a página já chamou, trocando só o período.
+CALENDAR_FETCH_JS = """
+const [listingId, month, year, count, done] = arguments;
+const used = performance.getEntriesByType("resource")
+    .map((entry) => entry.name)
+    .find((name) => name.includes("/PdpAvailabilityCalendar"));
+if (!used) { done(null); return; }
+const url = new URL(used);
+url.searchParams.set("variables", JSON.stringify(
+    {request: {count: count, listingId: String(listingId), month: month, year: year}}
+));
+const key = document.documentElement.innerHTML.match(/"api_config":\\{"key":"([^"]+)"/);
+fetch(url, {credentials: "include", headers: key ? {"X-Airbnb-API-Key": key[1]} : {}})
+    .then((response) => (response.ok ? response.json() : null))
+    .then(done, () => done(null));
+"""
+CALENDAR_REQUEST_SEEN_JS = (
+    "return performance.getEntriesByType('resource')"
+    ".some((entry) => entry.name.includes('/PdpAvailabilityCalendar'));"
+)
 
-        text_return = [f"🏡 Título do anúncio: {titulo}"]
 
-        if preco_total:
-            text_return.append(f"💰 Valor total: {preco_total}")
-        else:
-            text_return.append("⚠️ Preço não encontrado.")
+def _parse_calendar(payload):
+    """Converte a resposta do PdpAvailabilityCalendar em {data ISO: noite}."""
+    months = ((payload or {}).get("data") or {}).get("merlin", {}).get(
+        "pdpAvailabilityCalendar", {}
+    ).get("calendarMonths") or []
+    nights = {}
+    for month in months:
+        for day in month.get("days") or []:
+            nights[day["calendarDate"]] = {
+                # False só quando a noite está reservada ou bloqueada.
+                "disponivel": bool(day.get("available")),
+                "estadia_minima": day.get("minNights"),
+                "checkin": day.get("availableForCheckin"),
+                "checkout": day.get("availableForCheckout"),
+                "diaria": (day.get("price") or {}).get("localPriceFormatted"),
+            }
+    return nights
 
-        if disponivel:
-            text_return.append("✅ Imóvel disponível nas datas selecionadas.")
-        else:
-            text_return.append("❌ Imóvel indisponível nas datas selecionadas.")
-            if mensagem_indisponivel:
-                text_return.append(f"📝 Motivo: {mensagem_indisponivel}")
 
-        logger.info("Scraping finalizado para room_id %s.", room_id)
+def read_calendar(driver, room_id, start, days):
+    """
+    Lê o calendário do anúncio a partir de ``start`` com uma carga de página.
+
+    Retorna um dict com titulo e noites ({data ISO: disponivel,
+    estadia_minima, checkin, checkout, diaria}), ou None se o calendário não
+    pôde ser lido.
+    """
+    url = f"https://www.airbnb.com.br/rooms/{room_id}"
+    logger.info("Lendo calendário: %s", url)
+    with span("scraper.page_load"):
+        driver.get(url)
+        try:
+            WebDriverWait(driver, 30).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+        except TimeoutException:
+            logger.error("Timeout ao carregar o anúncio %s.", room_id)
+            return None
+
+    titulo = __extrair_titulo(driver)
+
+    with span("scraper.calendar"):
+        # O widget do calendário só busca os dados depois de montado.
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        try:
+            WebDriverWait(driver, 20).until(
+                lambda d: d.execute_script(CALENDAR_REQUEST_SEEN_JS)
+            )
+        except TimeoutException:
+            logger.warning("Página do anúncio %s não buscou o calendário.", room_id)
+            return None
 
-        return "\n".join(text_return)
+        driver.set_script_timeout(30)
+        payload = driver.execute_async_script(
+            CALENDAR_FETCH_JS, room_id, start.month, start.year, days // 28 + 2
+        )
+
+    nights = _parse_calendar(payload)
+    if not nights:
+        logger.warning("Calendário vazio para o anúncio %s.", room_id)
+        return None
+    return {"titulo": titulo, "noites": nights}
+
+
+def __process_each_room_id(
+    driver,
+    room_id,
+    check_in,
+    check_out,
+    guests,
+    adults,
+):
+    """
+    Processa um único ID de quarto e retorna o dict de ``scrape_room`` com o
+    room_id, ou um dict com ``erro`` se a página não carregou.
+    """
+    try:
+        info = scrape_room(driver, room_id, check_in, check_out, guests, adults)
+        if info is None:
+            return {"room_id": room_id, "erro": "Página não carregou completamente."}
+
+        logger.info("Scraping finalizado para room_id %s.", room_id)
+        return {"room_id": room_id, **info}
     except Exception as e:
         logger.error(
             "❌ Ocorreu um erro ao extrair as informações para room_id %s: %s",
@@ -481,17 +704,30 @@ def __process_each_room_id(
             e,
         )
         raise
+
+
+@contextlib.contextmanager
+def open_driver(profile=None):
+    """
+    Abre um navegador registrado para o encerramento e o fecha ao sair.
+    """
+    driver = __setup_driver(profile)
+    with _active_drivers_lock:
+        _active_drivers.add(driver)
+    try:
+        yield driver
     finally:
-        # O driver será fechado na função initialize_airbnb_scraper
-        pass
+        with _active_drivers_lock:
+            _active_drivers.discard(driver)
+        driver.quit()
+        logger.info("Driver do Chrome fechado.")
 
 
-def initialize_airbnb_scraper(**kwargs):
+def scrape_rooms(**kwargs):
     """
-    Função principal para iniciar o processo de scraping do Airbnb.
+    Faz o scraping dos quartos do owner e retorna um dict por quarto.
     """
     logger.info("Iniciando scraping do Airbnb...")
-    driver = None  # Inicializa driver como None
     try:
         check_in = kwargs.get("check_in")
         check_out = kwargs.get("check_out")
@@ -503,27 +739,55 @@ def initialize_airbnb_scraper(**kwargs):
             logger.error("❌ check_in e check_out são parâmetros obrigatórios.")
             raise ValueError("check_in e check_out são obrigatórios.")
 
-        driver = __setup_driver()  # Configura o driver
+        owner_id = (config or {}).get("metadata", {}).get("owner_id")
+        if not owner_rate_limiter.acquire(
+            "scrape", owner_id, timeout=SCRAPE_RATE_LIMIT_WAIT
+        ):
+            logger.warning("Limite de scraping atingido para owner_id %s.", owner_id)
+            raise RuntimeError(
+                "Muitas consultas de disponibilidade em sequência. "
+                "Tente novamente em instantes."
+            )
 
-        rooms_ids = __get_rooms_ids(config)
+        with open_driver() as driver:
+            rooms_ids = __get_rooms_ids(config)
 
-        results = []
-        for room_id in rooms_ids:
-            logger.info("Processando room_id: %s", room_id)
-            result = __process_each_room_id(
-                driver, room_id, check_in, check_out, guests, adults
-            )
-            results.append(result)
-            logger.info("Resultado do scraping para room_id %s: %s", room_id, result)
+            results = []
+            for room_id in rooms_ids:
+                logger.info("Processando room_id: %s", room_id)
+                result = __process_each_room_id(
+                    driver, room_id, check_in, check_out, guests, adults
+                )
+                results.append(result)
+                logger.info(
+                    "Resultado do scraping para room_id %s: %s", room_id, result
+                )
 
-        return "\n\n".join(
-            results
-        )  # Retorna todos os resultados separados por duas quebras de linha
+            return results
 
     except Exception as e:
         logger.error("❌ Ocorreu um erro ao iniciar o scraping: %s", e)
         raise
-    finally:
-        if driver:
+
+
+def warm_up():
+    """Resolve o chromedriver (e opcionalmente abre o Chrome) antes do consumo."""
+    with span("scraper.warm_up"):
+        get_chromedriver_path()
+        if SCRAPER_WARM_BROWSER:
+            __setup_driver().quit()
+
+
+def shutdown_scrapers():
+    """Fecha os navegadores ainda abertos (usado no encerramento do consumer)."""
+    with _active_drivers_lock:
+        drivers = list(_active_drivers)
+        _active_drivers.clear()
+
+    for driver in drivers:
+        try:
             driver.quit()
-            logger.info("Driver do Chrome fechado.")
+        except Exception as e:
+            logger.warning("Erro ao fechar driver do Chrome: %s", e)
+    if drivers:
+        logger.info("%d driver(s) do Chrome fechado(s) no encerramento.", len(drivers))
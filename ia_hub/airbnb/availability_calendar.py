@@ -0,0 +1,438 @@
+"""Calendário de disponibilidade e diárias pré-calculado por quarto.
+
+Um job em segundo plano lê o calendário de cada anúncio (uma carga de página
+por quarto para a janela inteira) e grava, por noite, se ela está reservada,
+a diária quando o Airbnb a informa e as regras de estadia mínima e de dias de
+entrada e saída. A ferramenta de disponibilidade responde pelo calendário
+quando todas as noites pedidas estão atualizadas e só cai no scraping ao vivo
+para o que faltar.
+
+Só uma noite reservada ou bloqueada conta como indisponível. Estadia mínima
+e dias em que não se pode entrar ou sair não ocupam a noite: com elas a
+consulta vai ao vivo, que traz o motivo exato.
+
+Uso (job de atualização):
+    python -m ia_hub.airbnb.availability_calendar
+    python -m ia_hub.airbnb.availability_calendar --once
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import psycopg2
+
+from .rooms_cache import rooms_cache
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_ENABLED = os.getenv("CALENDAR_ENABLED", "false").lower() == "true"
+CALENDAR_DAYS = int(os.getenv("CALENDAR_DAYS", "90"))
+# Hóspedes usados no scraping; pedidos com mais hóspedes vão ao vivo.
+CALENDAR_GUESTS = int(os.getenv("CALENDAR_GUESTS", "2"))
+CALENDAR_MAX_AGE_SECONDS = float(os.getenv("CALENDAR_MAX_AGE_SECONDS", "21600"))
+CALENDAR_REFRESH_INTERVAL = float(os.getenv("CALENDAR_REFRESH_INTERVAL", "300"))
+# Um quarto cuja atualização falhou só é tentado de novo depois disso.
+CALENDAR_RETRY_SECONDS = float(
+    os.getenv("CALENDAR_RETRY_SECONDS", str(CALENDAR_REFRESH_INTERVAL))
+)
+CALENDAR_BATCH_ROOMS = int(os.getenv("CALENDAR_BATCH_ROOMS", "5"))
+# Meia-vida da popularidade do quarto, que define a ordem de atualização.
+CALENDAR_SCORE_HALF_LIFE = float(os.getenv("CALENDAR_SCORE_HALF_LIFE", "604800"))
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS room_calendar (
+    room_id TEXT PRIMARY KEY,
+    title TEXT,
+    query_score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    scored_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    refreshed_at TIMESTAMPTZ
+);
+CREATE TABLE IF NOT EXISTS room_availability (
+    room_id TEXT NOT NULL,
+    night DATE NOT NULL,
+    available BOOLEAN,
+    nightly_price NUMERIC(10, 2),
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (room_id, night)
+);
+ALTER TABLE room_calendar ADD COLUMN IF NOT EXISTS failed_at TIMESTAMPTZ;
+ALTER TABLE room_availability
+    ADD COLUMN IF NOT EXISTS min_nights INTEGER,
+    ADD COLUMN IF NOT EXISTS checkin_allowed BOOLEAN,
+    ADD COLUMN IF NOT EXISTS checkout_allowed BOOLEAN;
+"""
+
+UPSERT_NIGHT_SQL = """
+INSERT INTO room_availability (
+    room_id, night, available, nightly_price, min_nights,
+    checkin_allowed, checkout_allowed, fetched_at
+)
+VALUES (%s, %s, %s, %s, %s, %s, %s, now())
+ON CONFLICT (room_id, night) DO UPDATE
+    SET available = EXCLUDED.available,
+        nightly_price = EXCLUDED.nightly_price,
+        min_nights = EXCLUDED.min_nights,
+        checkin_allowed = EXCLUDED.checkin_allowed,
+        checkout_allowed = EXCLUDED.checkout_allowed,
+        fetched_at = now()
+"""
+
+# A popularidade decai exponencialmente (ln 2 / meia-vida) desde a última consulta.
+RECORD_QUERY_SQL = """
+INSERT INTO room_calendar (room_id, query_score, scored_at)
+VALUES (%(room_id)s, 1, now())
+ON CONFLICT (room_id) DO UPDATE
+    SET query_score = room_calendar.query_score * exp(
+            -0.6931 * extract(epoch FROM now() - room_calendar.scored_at)
+            / %(half_life)s
+        ) + 1,
+        scored_at = now()
+"""
+
+ROOMS_TO_REFRESH_SQL = """
+SELECT r.id::text
+FROM rooms r
+LEFT JOIN room_calendar c ON c.room_id = r.id::text
+WHERE (
+        c.refreshed_at IS NULL
+        OR c.refreshed_at < now() - make_interval(secs => %(max_age)s)
+    )
+  AND (
+        c.failed_at IS NULL
+        OR c.failed_at < now() - make_interval(secs => %(retry)s)
+    )
+ORDER BY COALESCE(
+    c.query_score * exp(
+        -0.6931 * extract(epoch FROM now() - c.scored_at) / %(half_life)s
+    ),
+    0
+) DESC, c.refreshed_at NULLS FIRST
+LIMIT %(limit)s
+"""
+
+
+def parse_brl(text: Optional[str]) -> Optional[float]:
+    """Converte um valor em reais ("R$ 1.234,56") para float."""
+    if not text:
+        return None
+    match = re.search(r"R\$\s*([\d\.]+(?:,\d{1,2})?)", text)
+    if not match:
+        return None
+    return float(match.group(1).replace(".", "").replace(",", "."))
+
+
+def format_brl(value: float) -> str:
+    """Formata um valor em reais no padrão brasileiro."""
+    formatted = f"{value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    return f"R$ {formatted}"
+
+
+def format_room_text(room: Dict) -> str:
+    """Texto de um quarto no formato exibido pelo scraper."""
+    if room.get("erro"):
+        return f"❌ Erro: {room['erro']}"
+
+    lines = [f"🏡 Título do anúncio: {room.get('titulo')}"]
+    if room.get("preco_total"):
+        lines.append(f"💰 Valor total: {room['preco_total']}")
+        if room.get("taxas_incluidas") is False:
+            lines.append("(sem taxas de limpeza e serviço)")
+    else:
+        lines.append("⚠️ Preço não encontrado.")
+
+    if room.get("disponivel"):
+        lines.append("✅ Imóvel disponível nas datas selecionadas.")
+    else:
+        lines.append("❌ Imóvel indisponível nas datas selecionadas.")
+        if room.get("mensagem_indisponivel"):
+            lines.append(f"📝 Motivo: {room['mensagem_indisponivel']}")
+    return "\n".join(lines)
+
+
+class AvailabilityCalendar:
+    """Lê e atualiza o calendário de disponibilidade no Postgres."""
+
+    def __init__(self, postgres_url: Optional[str] = None):
+        self.postgres_url = postgres_url
+        self._schema_ready = False
+
+    def _connect(self):
+        connection = psycopg2.connect(self.postgres_url)
+        if not self._schema_ready:
+            with connection, connection.cursor() as cursor:
+                cursor.execute(SCHEMA_SQL)
+            self._schema_ready = True
+        return connection
+
+    def _room_ids(self, owner_id: str) -> List[str]:
+        # Mesma regra do scraper: um quarto por owner.
+        return rooms_cache.room_ids(owner_id, limit=1)
+
+    def lookup(
+        self, owner_id: str, check_in: date, check_out: date, guests: int
+    ) -> Optional[List[Dict]]:
+        """Responde pela tabela, ou None se é preciso consultar ao vivo.
+
+        Retorna um dict por quarto, com os mesmos campos de ``scrape_room``.
+
+        Só responde quando todas as noites da estadia estão no calendário e
+        atualizadas; uma noite já sabida como ocupada basta para a resposta
+        de indisponível.
+        """
+        if not self.postgres_url or not owner_id:
+            return None
+        nights = (check_out - check_in).days
+        # Mais hóspedes que o calendário ou datas fora da janela: ao vivo.
+        answerable = (
+            guests <= CALENDAR_GUESTS
+            and nights > 0
+            and check_out <= date.today() + timedelta(days=CALENDAR_DAYS)
+        )
+
+        try:
+            connection = self._connect()
+        except psycopg2.Error as e:
+            logger.warning("Calendário indisponível: %s", e)
+            return None
+
+        answers = []
+        try:
+            with connection, connection.cursor() as cursor:
+                for room_id in self._room_ids(owner_id):
+                    # Toda consulta conta para a prioridade de atualização.
+                    cursor.execute(
+                        RECORD_QUERY_SQL,
+                        {"room_id": room_id, "half_life": CALENDAR_SCORE_HALF_LIFE},
+                    )
+                    answer = (
+                        self._answer_room(cursor, room_id, check_in, check_out)
+                        if answerable
+                        else None
+                    )
+                    if answer is None:
+                        return None
+                    answers.append(answer)
+        except psycopg2.Error as e:
+            logger.warning("Erro ao consultar o calendário: %s", e)
+            return None
+        finally:
+            connection.close()
+
+        return answers or None
+
+    def _answer_room(
+        self, cursor, room_id: str, check_in: date, check_out: date
+    ) -> Optional[Dict]:
+        cursor.execute("SELECT title FROM room_calendar WHERE room_id = %s", (room_id,))
+        row = cursor.fetchone()
+        room = {
+            "room_id": room_id,
+            "titulo": row[0] if row and row[0] else "⚠️ Título não encontrado",
+            "preco_total": None,
+            "diaria": None,
+            "disponivel": False,
+            "mensagem_indisponivel": None,
+        }
+
+        # Inclui o dia da saída, que só importa pela regra de checkout.
+        cursor.execute(
+            """
+            SELECT night, available, nightly_price, min_nights,
+                   checkin_allowed, checkout_allowed
+            FROM room_availability
+            WHERE room_id = %s AND night >= %s AND night <= %s
+              AND fetched_at >= now() - make_interval(secs => %s)
+            """,
+            (room_id, check_in, check_out, CALENDAR_MAX_AGE_SECONDS),
+        )
+        rows = {row[0]: row[1:] for row in cursor}
+
+        nights = [
+            check_in + timedelta(days=i) for i in range((check_out - check_in).days)
+        ]
+        if any(rows[night][0] is False for night in nights if night in rows):
+            room["mensagem_indisponivel"] = "Há noites já reservadas nessas datas."
+            return room
+
+        if any(
+            night not in rows or rows[night][0] is None or rows[night][1] is None
+            for night in nights
+        ):
+            return None
+
+        # Noites livres, mas a estadia pode não ser aceita: a consulta ao vivo
+        # traz o motivo (estadia mínima, dia de entrada ou de saída).
+        min_nights, checkin_allowed = rows[check_in][2], rows[check_in][3]
+        checkout_allowed = rows[check_out][4] if check_out in rows else None
+        if (
+            (min_nights and len(nights) < min_nights)
+            or checkin_allowed is False
+            or not checkout_allowed
+        ):
+            return None
+
+        total = sum(float(rows[night][1]) for night in nights)
+        room.update(
+            preco_total=format_brl(total),
+            diaria=format_brl(total / len(nights)),
+            disponivel=True,
+            # Só as diárias: limpeza e serviço aparecem apenas no checkout.
+            taxas_incluidas=False,
+        )
+        return room
+
+    def rooms_to_refresh(self, limit: int = CALENDAR_BATCH_ROOMS) -> List[str]:
+        """Quartos com calendário vencido, dos mais consultados para os menos."""
+        connection = self._connect()
+        try:
+            with connection, connection.cursor() as cursor:
+                cursor.execute(
+                    ROOMS_TO_REFRESH_SQL,
+                    {
+                        "max_age": CALENDAR_MAX_AGE_SECONDS,
+                        "retry": CALENDAR_RETRY_SECONDS,
+                        "half_life": CALENDAR_SCORE_HALF_LIFE,
+                        "limit": limit,
+                    },
+                )
+                return [row[0] for row in cursor.fetchall()]
+        finally:
+            connection.close()
+
+    def _store_calendar(
+        self, room_id: str, start: date, days: int, calendar: Dict
+    ) -> int:
+        """Grava as noites da janela lidas do calendário. Retorna quantas."""
+        rows = []
+        for offset in range(days + 1):
+            night = start + timedelta(days=offset)
+            info = calendar["noites"].get(night.isoformat())
+            if info is None:
+                continue
+            rows.append(
+                (
+                    room_id,
+                    night,
+                    info["disponivel"],
+                    parse_brl(info["diaria"]),
+                    info["estadia_minima"],
+                    info["checkin"],
+                    info["checkout"],
+                )
+            )
+
+        title = calendar.get("titulo")
+        if title and title.startswith("⚠️"):
+            title = None
+
+        connection = self._connect()
+        try:
+            with connection, connection.cursor() as cursor:
+                cursor.executemany(UPSERT_NIGHT_SQL, rows)
+                cursor.execute(
+                    """
+                    INSERT INTO room_calendar (room_id, title, refreshed_at)
+                    VALUES (%s, %s, now())
+                    ON CONFLICT (room_id) DO UPDATE
+                        SET title = COALESCE(EXCLUDED.title, room_calendar.title),
+                            refreshed_at = now(),
+                            failed_at = NULL
+                    """,
+                    (room_id, title),
+                )
+                cursor.execute(
+                    "DELETE FROM room_availability WHERE room_id = %s AND night < %s",
+                    (room_id, start),
+                )
+        finally:
+            connection.close()
+        return len(rows)
+
+    def refresh_room(self, driver, room_id: str, days: int = CALENDAR_DAYS) -> int:
+        """Relê o calendário do quarto para a janela. Retorna quantas noites."""
+        from .airbnb_scrapper import read_calendar
+
+        start = date.today()
+        calendar = read_calendar(driver, room_id, start, days)
+        if calendar is None:
+            # Sem marcar refreshed_at: o quarto volta no próximo lote.
+            raise RuntimeError(f"Calendário do quarto {room_id} não foi lido.")
+        return self._store_calendar(room_id, start, days, calendar)
+
+    def _record_failure(self, room_id: str) -> None:
+        """Tira o quarto dos próximos lotes por CALENDAR_RETRY_SECONDS."""
+        connection = self._connect()
+        try:
+            with connection, connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO room_calendar (room_id, failed_at) VALUES (%s, now())
+                    ON CONFLICT (room_id) DO UPDATE SET failed_at = now()
+                    """,
+                    (room_id,),
+                )
+        finally:
+            connection.close()
+
+    def _refresh_batch(self, limit: int) -> Tuple[int, int]:
+        """Atualiza um lote; retorna (quartos tentados, quartos atualizados)."""
+        from .airbnb_scrapper import open_driver
+
+        rooms = self.rooms_to_refresh(limit)
+        if not rooms:
+            return 0, 0
+        refreshed = 0
+        with open_driver() as driver:
+            for room_id in rooms:
+                try:
+                    nights = self.refresh_room(driver, room_id)
+                    logger.info(
+                        "Calendário do quarto %s: %d noite(s).", room_id, nights
+                    )
+                    refreshed += 1
+                except Exception:
+                    logger.exception("Erro ao atualizar o calendário de %s", room_id)
+                    try:
+                        self._record_failure(room_id)
+                    except psycopg2.Error as e:
+                        logger.warning("Falha ao registrar erro de %s: %s", room_id, e)
+        return len(rooms), refreshed
+
+    def refresh(self, limit: int = CALENDAR_BATCH_ROOMS) -> int:
+        """Atualiza um lote de quartos com um único navegador.
+
+        Retorna quantos foram atualizados; os que falharam ficam fora dos
+        lotes seguintes por CALENDAR_RETRY_SECONDS.
+        """
+        return self._refresh_batch(limit)[1]
+
+    def run(self, once: bool = False) -> None:
+        """Loop do job: atualiza lotes e dorme quando nenhum quarto foi atualizado.
+
+        Com ``once`` termina quando não há mais quartos a tentar.
+        """
+        while True:
+            attempted, refreshed = self._refresh_batch(CALENDAR_BATCH_ROOMS)
+            if once:
+                if not attempted:
+                    return
+                # Os que falharam já saíram da seleção; segue para o próximo lote.
+                continue
+            if not refreshed:
+                time.sleep(CALENDAR_REFRESH_INTERVAL)
+
+
+# Instância singleton
+availability_calendar = AvailabilityCalendar(os.getenv("POSTGRES_URL"))
+
+
+if __name__ == "__main__":
+    if not availability_calendar.postgres_url:
+        print("POSTGRES_URL não definida.")
+        sys.exit(1)
+    availability_calendar.run(once="--once" in sys.argv)
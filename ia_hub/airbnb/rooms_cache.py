@@ -0,0 +1,182 @@
+"""Cache em memória dos quartos de cada owner.
+
+A tabela ``rooms`` é carregada inteira na inicialização e mantida atual por
+um trigger que publica o owner alterado no canal ``rooms_changed``; o TTL
+recarrega tudo caso alguma notificação se perca (ex.: reconexão).
+
+Instalação do trigger:
+    python -m ia_hub.airbnb.rooms_cache --install-trigger
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+import psycopg2.extras
+
+from ..database import ROOMS_CHANGED_CHANNEL, pg_listener
+from ..observability.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+ROOMS_CACHE_TTL_SECONDS = float(os.getenv("ROOMS_CACHE_TTL_SECONDS", "900"))
+
+TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION notify_rooms_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM pg_notify('{ROOMS_CHANGED_CHANNEL}', OLD.owner_id::text);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM pg_notify('{ROOMS_CHANGED_CHANNEL}', NEW.owner_id::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS rooms_changed ON rooms;
+CREATE TRIGGER rooms_changed
+    AFTER INSERT OR UPDATE OR DELETE ON rooms
+    FOR EACH ROW EXECUTE FUNCTION notify_rooms_changed();
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class Room:
+    """Quarto com as demais colunas da tabela rooms em ``attributes``."""
+
+    id: str
+    owner_id: str
+    attributes: Dict[str, Any]
+
+
+def _to_room(row: Dict[str, Any]) -> Room:
+    attributes = {k: v for k, v in row.items() if k not in ("id", "owner_id")}
+    return Room(id=str(row["id"]), owner_id=str(row["owner_id"]), attributes=attributes)
+
+
+class RoomsCache:
+    """Mapa owner_id → quartos, sem ida ao banco no caminho do scraper."""
+
+    def __init__(
+        self,
+        postgres_url: Optional[str] = None,
+        ttl_seconds: float = ROOMS_CACHE_TTL_SECONDS,
+    ):
+        self.postgres_url = postgres_url
+        self.ttl_seconds = ttl_seconds
+        self._rooms: Dict[str, List[Room]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _query(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        connection = psycopg2.connect(self.postgres_url or os.getenv("POSTGRES_URL"))
+        try:
+            with connection.cursor(
+                cursor_factory=psycopg2.extras.RealDictCursor
+            ) as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            connection.close()
+
+    def load(self) -> int:
+        """Carrega todos os quartos de uma vez. Retorna quantos owners."""
+        rows = self._query("SELECT * FROM rooms ORDER BY owner_id, id")
+        rooms: Dict[str, List[Room]] = {}
+        for row in rows:
+            room = _to_room(row)
+            rooms.setdefault(room.owner_id, []).append(room)
+
+        with self._lock:
+            self._rooms = rooms
+            self._loaded_at = time.monotonic()
+        logger.info("Cache de quartos carregado: %d owner(s).", len(rooms))
+        return len(rooms)
+
+    def _load_owner(self, owner_id: str) -> List[Room]:
+        rows = self._query(
+            "SELECT * FROM rooms WHERE owner_id = %s ORDER BY id", (owner_id,)
+        )
+        rooms = [_to_room(row) for row in rows]
+        with self._lock:
+            self._rooms[owner_id] = rooms
+        return rooms
+
+    def invalidate_owner(self, owner_id: str) -> None:
+        """Recarrega os quartos de um owner (notificação do trigger)."""
+        try:
+            self._load_owner(owner_id)
+            logger.info("Quartos do owner_id %s recarregados.", owner_id)
+        except psycopg2.Error as e:
+            # Sem o banco agora, a próxima consulta busca de novo.
+            logger.warning("Falha ao recarregar quartos de %s: %s", owner_id, e)
+            with self._lock:
+                self._rooms.pop(owner_id, None)
+
+    def get_rooms(self, owner_id: str) -> List[Room]:
+        """Retorna os quartos do owner, ordenados por id."""
+        expired = (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.ttl_seconds
+        )
+        if expired:
+            with self._lock:
+                # Outra thread pode ter recarregado enquanto esperávamos.
+                expired = (
+                    self._loaded_at is None
+                    or time.monotonic() - self._loaded_at > self.ttl_seconds
+                )
+                if expired:
+                    # Evita que outras threads também recarreguem.
+                    self._loaded_at = time.monotonic()
+            if expired:
+                try:
+                    self.load()
+                except psycopg2.Error as e:
+                    logger.warning("Falha ao recarregar o cache de quartos: %s", e)
+
+        rooms = self._rooms.get(owner_id)
+        if rooms is not None:
+            CACHE_REQUESTS.inc(cache="rooms", result="hit")
+            return rooms
+
+        # Owner novo cuja notificação ainda não chegou.
+        CACHE_REQUESTS.inc(cache="rooms", result="miss")
+        return self._load_owner(owner_id)
+
+    def room_ids(self, owner_id: str, limit: Optional[int] = None) -> List[str]:
+        return [room.id for room in self.get_rooms(owner_id)[:limit]]
+
+
+def install_trigger(postgres_url: Optional[str] = None) -> None:
+    """Cria (ou recria) o trigger que notifica alterações na tabela rooms."""
+    connection = psycopg2.connect(postgres_url or os.getenv("POSTGRES_URL", ""))
+    try:
+        with connection, connection.cursor() as cursor:
+            cursor.execute(TRIGGER_SQL)
+    finally:
+        connection.close()
+
+
+def _create_rooms_cache() -> RoomsCache:
+    cache = RoomsCache()
+    pg_listener.subscribe(ROOMS_CHANGED_CHANNEL, cache.invalidate_owner)
+    return cache
+
+
+# Instância singleton
+rooms_cache = _create_rooms_cache()
+
+
+if __name__ == "__main__":
+    if "--install-trigger" in sys.argv:
+        install_trigger()
+        print(f"Trigger rooms_changed instalado (canal {ROOMS_CHANGED_CHANNEL}).")
+    else:
+        print("Uso: python -m ia_hub.airbnb.rooms_cache --install-trigger")
@@ -0,0 +1,15 @@
+"""Módulo de banco de dados - Notificações do Postgres."""
+
+from .notifications import (
+    pg_listener,
+    notify,
+    KNOWLEDGE_UPDATED_CHANNEL,
+    ROOMS_CHANGED_CHANNEL,
+)
+
+__all__ = [
+    "pg_listener",
+    "notify",
+    "KNOWLEDGE_UPDATED_CHANNEL",
+    "ROOMS_CHANGED_CHANNEL",
+]
@@ -0,0 +1,116 @@
+"""Escuta de notificações LISTEN/NOTIFY do Postgres para invalidar caches."""
+
+import os
+import time
+import select
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+NotificationHandler = Callable[[str], None]
+
+# Disparado pelo knowledge_manager quando a base de conhecimento de um owner muda.
+KNOWLEDGE_UPDATED_CHANNEL = "knowledge_updated"
+# Disparado pelo trigger da tabela rooms com o owner_id afetado.
+ROOMS_CHANGED_CHANNEL = "rooms_changed"
+
+
+class PgNotificationListener:
+    """Mantém uma conexão em LISTEN e repassa cada payload aos handlers do canal."""
+
+    def __init__(self, postgres_url: Optional[str] = None, poll_interval: float = 5.0):
+        self.postgres_url = postgres_url
+        self.poll_interval = poll_interval
+        self._handlers: Dict[str, List[NotificationHandler]] = {}
+        self._listening: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, channel: str, handler: NotificationHandler) -> None:
+        """Registra um handler; pode ser chamado antes ou depois do start."""
+        with self._lock:
+            self._handlers.setdefault(channel, []).append(handler)
+
+    def start(self) -> bool:
+        """Inicia a thread de escuta. Retorna False se não houver Postgres."""
+        postgres_url = self.postgres_url or os.getenv("POSTGRES_URL")
+        if not postgres_url:
+            logger.info("POSTGRES_URL não definida; notificações desativadas.")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(postgres_url,), name="pg-listener", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def _listen_new_channels(self, cursor) -> None:
+        with self._lock:
+            channels = set(self._handlers) - self._listening
+        for channel in channels:
+            cursor.execute(f'LISTEN "{channel}"')
+            self._listening.add(channel)
+            logger.info("Escutando notificações no canal %s", channel)
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(channel, []))
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Erro no handler da notificação %s", channel)
+
+    def _run(self, postgres_url: str) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(postgres_url)
+                connection.autocommit = True
+                cursor = connection.cursor()
+                self._listening.clear()
+
+                while not self._stop.is_set():
+                    self._listen_new_channels(cursor)
+                    ready, _, _ = select.select(
+                        [connection], [], [], self.poll_interval
+                    )
+                    if not ready:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        self._dispatch(notification.channel, notification.payload)
+            except psycopg2.Error as e:
+                logger.warning("Conexão de notificações perdida (%s); reconectando.", e)
+                time.sleep(self.poll_interval)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+def notify(channel: str, payload: str, postgres_url: Optional[str] = None) -> None:
+    """Envia uma notificação NOTIFY no canal informado."""
+    connection = psycopg2.connect(postgres_url or os.getenv("POSTGRES_URL", ""))
+    try:
+        with connection, connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", (channel, payload))
+    finally:
+        connection.close()
+
+
+# Instância singleton
+pg_listener = PgNotificationListener()
@@ -0,0 +1,106 @@
+"""Backend de embeddings da base de conhecimento e dos caches semânticos.
+
+``EMBEDDING_BACKEND=openai`` usa a API da OpenAI (padrão). ``local`` roda um
+modelo sentence-transformers na CPU, em lotes, sem ida à rede; requer
+``pip install sentence-transformers``.
+
+``EMBEDDING_DIMENSIONS`` reduz o tamanho dos vetores: na OpenAI pelo
+parâmetro ``dimensions`` dos modelos text-embedding-3, no modelo local
+truncando e renormalizando. Vetores menores deixam o índice do pgvector
+menor e as buscas mais rápidas, mas exigem reprocessar a coleção
+(``python -m ia_hub.knowledge.knowledge_manager --reembed``).
+"""
+
+import os
+import logging
+import functools
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+# Modelo da OpenAI para a base de conhecimento.
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
+# Multilíngue, 384 dimensões; bom em português e leve para CPU.
+EMBEDDING_LOCAL_MODEL = os.getenv(
+    "EMBEDDING_LOCAL_MODEL",
+    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+)
+# 0 mantém o tamanho original do modelo.
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_model(model_name: str):
+    """Carrega o modelo uma vez por processo, compartilhado entre instâncias."""
+    from sentence_transformers import SentenceTransformer
+
+    logger.info("Carregando modelo de embeddings %s", model_name)
+    return SentenceTransformer(model_name, device="cpu")
+
+
+class LocalEmbeddings(Embeddings):
+    """Embeddings de um modelo sentence-transformers na CPU.
+
+    O modelo é carregado no primeiro uso; os textos são codificados em lotes
+    de ``batch_size`` e a redução de dimensão é feita de uma vez sobre a
+    matriz do lote.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_LOCAL_MODEL,
+        dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ):
+        self.model_name = model_name
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        import numpy as np
+
+        vectors = _load_model(self.model_name).encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        if self.dimensions and self.dimensions < vectors.shape[1]:
+            vectors = vectors[:, : self.dimensions]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+        return vectors.astype(np.float32).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+@functools.lru_cache(maxsize=None)
+def get_embeddings(
+    openai_model: str = EMBEDDING_MODEL,
+    dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+) -> Embeddings:
+    """Retorna o backend de embeddings configurado (uma instância por processo).
+
+    Args:
+        openai_model: Modelo usado com o backend ``openai``; o backend local
+            usa sempre ``EMBEDDING_LOCAL_MODEL``, carregado uma vez só.
+        dimensions: Tamanho dos vetores; None mantém o do modelo.
+    """
+    if EMBEDDING_BACKEND == "local":
+        return LocalEmbeddings(dimensions=dimensions)
+    if EMBEDDING_BACKEND != "openai":
+        raise ValueError(f"EMBEDDING_BACKEND inválido: {EMBEDDING_BACKEND}")
+
+    from langchain_openai import OpenAIEmbeddings
+
+    if dimensions:
+        return OpenAIEmbeddings(model=openai_model, dimensions=dimensions)
+    return OpenAIEmbeddings(model=openai_model)
@@ -1,30 +1,123 @@
 import os
 import sys
-from typing import List
-from langchain_openai import OpenAIEmbeddings
+from typing import List, Optional
+
+import psycopg2
 from langchain_postgres.vectorstores import PGVector
 
+from ia_hub.database import KNOWLEDGE_UPDATED_CHANNEL, notify
+from ia_hub.knowledge.embeddings import EMBEDDING_BATCH_SIZE, get_embeddings
+
+# Coleção do PGVector com a base de conhecimento. Ao trocar de backend ou de
+# dimensão, reprocesse para uma coleção nova (--reembed) e aponte para ela.
+KNOWLEDGE_COLLECTION = os.getenv("KNOWLEDGE_COLLECTION", "langchain")
+
+COLLECTION_DOCUMENTS_SQL = """
+SELECT e.id, e.document, e.cmetadata
+FROM langchain_pg_embedding e
+JOIN langchain_pg_collection c ON c.uuid = e.collection_id
+WHERE c.name = %s
+ORDER BY e.id
+"""
+
+COLLECTION_COUNT_SQL = """
+SELECT count(*)
+FROM langchain_pg_embedding e
+JOIN langchain_pg_collection c ON c.uuid = e.collection_id
+WHERE c.name = %s
+"""
+
+
+def create_vector_store(collection_name: Optional[str] = None) -> PGVector:
+    """
+    Cria o PGVector da base de conhecimento com o backend de embeddings configurado.
+    """
+    return PGVector(
+        embeddings=get_embeddings(),
+        collection_name=collection_name or KNOWLEDGE_COLLECTION,
+        connection=os.getenv("POSTGRES_URL", ""),
+        use_jsonb=True,
+    )
+
 
 def __load_documents_to_knowledge_base(
     owner_id: str,
     documents: List[str],
-    embedding_model: str = "text-embedding-3-large",
-    use_jsonb: bool = True,
 ) -> None:
     """
     Carrega uma lista de documentos (strings) na base de conhecimento (tabela knowledge)
     usando LangChain e PGVector, registrando um identificador nos metadados.
     """
-    vector_store = PGVector(
-        embeddings=OpenAIEmbeddings(model=embedding_model),
-        connection=os.getenv("POSTGRES_URL", ""),
-        use_jsonb=use_jsonb,
-    )
+    vector_store = create_vector_store()
 
     metadatas = [{"owner_id": owner_id} for _ in documents]
 
     vector_store.add_texts(documents, metadatas=metadatas)
 
+    # Avisa os consumers para descartarem respostas em cache deste owner.
+    notify(KNOWLEDGE_UPDATED_CHANNEL, owner_id)
+
+
+def __count_documents(connection, collection: str) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(COLLECTION_COUNT_SQL, (collection,))
+        return cursor.fetchone()[0]
+
+
+def __reembed_collection(source: str, target: str) -> int:
+    """
+    Copia os documentos da coleção ``source`` para ``target`` gerando os vetores
+    de novo com o backend atual. Retorna quantos documentos foram copiados.
+
+    O id é chave primária da tabela inteira e o upsert do PGVector não troca
+    a coleção do registro: reaproveitar o id de origem sobrescreveria a
+    coleção atual. Cada cópia recebe ``<target>:<id de origem>``, estável,
+    então rodar de novo retoma sem duplicar. No fim as duas coleções precisam
+    ter o mesmo número de documentos.
+    """
+    target_store = create_vector_store(target)
+    connection = psycopg2.connect(os.getenv("POSTGRES_URL", ""))
+    copied = 0
+    try:
+        # Cursor nomeado: lê a coleção em lotes, sem carregá-la inteira.
+        with connection.cursor(name="reembed") as cursor:
+            cursor.execute(COLLECTION_DOCUMENTS_SQL, (source,))
+            while True:
+                rows = cursor.fetchmany(EMBEDDING_BATCH_SIZE)
+                if not rows:
+                    break
+                target_store.add_texts(
+                    [row[1] for row in rows],
+                    metadatas=[row[2] or {} for row in rows],
+                    ids=[f"{target}:{row[0]}" for row in rows],
+                )
+                copied += len(rows)
+                print(f"{copied} documento(s) reprocessado(s)...")
+        connection.commit()
+
+        source_count = __count_documents(connection, source)
+        target_count = __count_documents(connection, target)
+    finally:
+        connection.close()
+
+    if target_count != source_count:
+        raise RuntimeError(
+            f"Coleção {target} ficou com {target_count} documento(s), "
+            f"{source} tem {source_count}. Não troque KNOWLEDGE_COLLECTION."
+        )
+    return copied
+
+
+def __parse_option_from_argv(name: str):
+    """
+    Busca o parâmetro --name=valor na linha de comando.
+    """
+    prefix = f"--{name}="
+    for arg in sys.argv:
+        if arg.startswith(prefix):
+            return arg[len(prefix) :]
+    return None
+
 
 def __parse_owner_id_from_argv():
     """
@@ -49,7 +142,16 @@ def __parse_document_from_argv():
 if __name__ == "__main__":
     owner_id_from_argv = __parse_owner_id_from_argv()
     document_from_argv = __parse_document_from_argv()
-    if owner_id_from_argv and document_from_argv:
+    target_collection = __parse_option_from_argv("to")
+    source_collection = __parse_option_from_argv("from") or KNOWLEDGE_COLLECTION
+    if "--reembed" in sys.argv and target_collection not in (None, source_collection):
+        total = __reembed_collection(source_collection, target_collection)
+        print(
+            f"{total} documento(s) copiado(s) de {source_collection} para "
+            f"{target_collection}. Defina KNOWLEDGE_COLLECTION={target_collection} "
+            "nos consumers com o mesmo EMBEDDING_BACKEND/EMBEDDING_DIMENSIONS."
+        )
+    elif owner_id_from_argv and document_from_argv:
         __load_documents_to_knowledge_base(
             owner_id=owner_id_from_argv,
             documents=[document_from_argv],
@@ -57,6 +159,12 @@ if __name__ == "__main__":
         print(f"Documento carregado para owner_id={owner_id_from_argv}:")
         print(document_from_argv)
     else:
-        print("Uso: python knowledge_manager.py --owner_id=ID --document='texto'")
+        print(
+            "Uso: python -m ia_hub.knowledge.knowledge_manager "
+            "--owner_id=ID --document='texto'\n"
+            "     python -m ia_hub.knowledge.knowledge_manager "
+            "--reembed --to=COLECAO_NOVA [--from=COLECAO_ATUAL]"
+        )
 
-# python knowledge_manager.py --owner_id=SEU_ID --document="Seu texto do documento aqui"
+# python -m ia_hub.knowledge.knowledge_manager --owner_id=SEU_ID --document="Seu texto do documento aqui"
+# python -m ia_hub.knowledge.knowledge_manager --reembed --to=knowledge_local_384
@@ -0,0 +1,17 @@
+"""Módulo de observabilidade - Métricas e spans de latência."""
+
+from .metrics import (
+    registry,
+    span,
+    new_trace_id,
+    trace_id_var,
+    start_metrics_server,
+)
+
+__all__ = [
+    "registry",
+    "span",
+    "new_trace_id",
+    "trace_id_var",
+    "start_metrics_server",
+]
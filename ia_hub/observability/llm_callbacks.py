@@ -0,0 +1,82 @@
+"""Callback do LangChain que alimenta as métricas de chamadas ao LLM."""
+
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from .metrics import LLM_CALLS, LLM_DURATION, LLM_TOKENS
+
+# O RoutedChatModel só delega: a chamada real aparece como run filho dele.
+ROUTER_LLM_TYPE = "routed-chat"
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Registra latência, chamadas e tokens de cada execução de chat model."""
+
+    def __init__(self):
+        self._started: Dict[UUID, tuple] = {}
+
+    @staticmethod
+    def _model_name(serialized: Dict[str, Any], kwargs: Dict[str, Any]) -> str:
+        params = kwargs.get("invocation_params") or {}
+        return (
+            params.get("model")
+            or params.get("model_name")
+            or (serialized or {}).get("name")
+            or "unknown"
+        )
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        if (kwargs.get("invocation_params") or {}).get("_type") == ROUTER_LLM_TYPE:
+            return
+        self._started[run_id] = (
+            time.perf_counter(),
+            self._model_name(serialized, kwargs),
+        )
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = (
+            time.perf_counter(),
+            self._model_name(serialized, kwargs),
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        if run_id not in self._started:
+            return
+        started, model = self._started.pop(run_id)
+        messages = [
+            generation.message
+            for generations in response.generations
+            for generation in generations
+            if getattr(generation, "message", None) is not None
+        ]
+        # Modelos roteados informam o modelo real nos metadados da resposta.
+        for message in messages:
+            model = message.response_metadata.get("model_name") or model
+
+        if started is not None:
+            LLM_DURATION.observe(time.perf_counter() - started, model=model)
+        LLM_CALLS.inc(model=model, status="ok")
+
+        for message in messages:
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                LLM_TOKENS.inc(usage.get("input_tokens", 0), model=model, kind="input")
+                LLM_TOKENS.inc(
+                    usage.get("output_tokens", 0), model=model, kind="output"
+                )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        if run_id not in self._started:
+            return
+        started, model = self._started.pop(run_id)
+        if started is not None:
+            LLM_DURATION.observe(time.perf_counter() - started, model=model)
+        LLM_CALLS.inc(model=model, status="error")
+
+
+# Instância singleton
+llm_metrics_callback = LLMMetricsCallback()
@@ -0,0 +1,303 @@
+"""Métricas no formato Prometheus e spans de latência do pipeline."""
+
+import os
+import abc
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Identificador da mensagem em processamento, propagado para os logs de span.
+trace_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "trace_id", default=None
+)
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric(abc.ABC):
+    """Base das métricas: nome, ajuda e valores por conjunto de labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Linhas de amostra no formato de exposição do Prometheus."""
+
+
+class Counter(_Metric):
+    """Contador monotônico."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in items]
+
+
+class Gauge(Counter):
+    """Valor que sobe e desce (ex.: mensagens em processamento)."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Histograma com buckets cumulativos."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            # [contagem por bucket..., +Inf, soma]
+            data = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[index] += 1
+            data[-2] += 1
+            data[-1] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(data)) for key, data in self._values.items()]
+
+        lines = []
+        for key, data in items:
+            for bound, count in zip(self.buckets, data):
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(key, [('le', str(bound))])} {count}"
+                )
+            lines.append(
+                f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {data[-2]}"
+            )
+            lines.append(f"{self.name}_count{_format_labels(key)} {data[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {data[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registro das métricas expostas no endpoint /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        return self._register(Gauge(name, documentation))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Instância singleton
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    "ia_hub_stage_duration_seconds", "Duração de cada etapa do pipeline."
+)
+QUEUE_LAG = registry.histogram(
+    "ia_hub_queue_lag_seconds", "Tempo entre a publicação e o consumo da mensagem."
+)
+MESSAGES_IN_FLIGHT = registry.gauge(
+    "ia_hub_messages_in_flight", "Mensagens sendo processadas no momento."
+)
+MESSAGES_TOTAL = registry.counter(
+    "ia_hub_messages_total", "Mensagens consumidas, por resultado."
+)
+LLM_CALLS = registry.counter("ia_hub_llm_calls_total", "Chamadas ao LLM, por modelo.")
+LLM_DURATION = registry.histogram(
+    "ia_hub_llm_duration_seconds", "Latência das chamadas ao LLM."
+)
+LLM_TOKENS = registry.counter(
+    "ia_hub_llm_tokens_total", "Tokens consumidos pelo LLM, por modelo e tipo."
+)
+TOOL_DURATION = registry.histogram(
+    "ia_hub_tool_duration_seconds", "Latência das ferramentas, por ferramenta e status."
+)
+CACHE_REQUESTS = registry.counter(
+    "ia_hub_cache_requests_total", "Consultas aos caches, por cache e resultado."
+)
+LLM_CALLS_AVOIDED = registry.counter(
+    "ia_hub_llm_calls_avoided_total",
+    "Mensagens respondidas sem executar o agente, por rota e motivo.",
+)
+
+
+def new_trace_id() -> str:
+    """Gera um identificador curto para correlacionar os spans de uma mensagem."""
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def span(stage: str, **labels) -> Iterator[None]:
+    """Mede a duração de uma etapa, registra no histograma e no log."""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.observe(elapsed, stage=stage, **labels)
+        logger.info(
+            "span stage=%s status=%s duration_ms=%.1f trace_id=%s %s",
+            stage,
+            status,
+            elapsed * 1000,
+            trace_id_var.get(),
+            " ".join(f"{name}={value}" for name, value in labels.items()),
+            extra={
+                "span": stage,
+                "status": status,
+                "duration_ms": elapsed * 1000,
+                "trace_id": trace_id_var.get(),
+                # Aninhados: um label como "name" ou "message" colidiria com
+                # os atributos do LogRecord.
+                "labels": labels,
+            },
+        )
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics: " + format, *args)
+
+
+def start_metrics_server(
+    port: Optional[int] = None, host: str = METRICS_HOST
+) -> Optional[ThreadingHTTPServer]:
+    """Sobe o endpoint /metrics em uma thread daemon.
+
+    Sem porta explícita usa METRICS_PORT; se ela não estiver definida o
+    servidor não é iniciado.
+    """
+    if port is None:
+        if not METRICS_PORT:
+            return None
+        port = int(METRICS_PORT)
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    )
+    thread.start()
+    logger.info("Endpoint de métricas disponível em http://%s:%d/metrics", host, port)
+    return server
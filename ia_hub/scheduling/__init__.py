@@ -0,0 +1,10 @@
+"""Módulo de escalonamento - Fila justa por owner e limites de taxa."""
+
+from .fair_scheduler import FairScheduler, ScheduledMessage
+from .rate_limiter import owner_rate_limiter
+
+__all__ = [
+    "FairScheduler",
+    "ScheduledMessage",
+    "owner_rate_limiter",
+]
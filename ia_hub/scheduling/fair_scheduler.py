@@ -0,0 +1,220 @@
+"""Escalonador justo entre owners para as mensagens consumidas do broker."""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from ..observability.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "4"))
+SCHEDULER_MAX_IN_FLIGHT_PER_OWNER = int(
+    os.getenv("SCHEDULER_MAX_IN_FLIGHT_PER_OWNER", "2")
+)
+
+SCHEDULER_QUEUED = registry.gauge(
+    "ia_hub_scheduler_queued", "Mensagens aguardando no escalonador."
+)
+SCHEDULER_WAIT = registry.histogram(
+    "ia_hub_scheduler_wait_seconds", "Tempo de espera no escalonador até o início."
+)
+
+
+def _load_owner_weights() -> Dict[str, float]:
+    raw = os.getenv("SCHEDULER_OWNER_WEIGHTS")
+    if not raw:
+        return {}
+    try:
+        return {owner: float(weight) for owner, weight in json.loads(raw).items()}
+    except (ValueError, AttributeError) as e:
+        logger.warning("SCHEDULER_OWNER_WEIGHTS inválido, ignorando: %s", e)
+        return {}
+
+
+@dataclass
+class ScheduledMessage:
+    """Mensagem aguardando processamento, com a chave de roteamento."""
+
+    owner_id: str
+    thread_id: str
+    payload: Any
+    delivery_tag: Optional[int] = None
+    properties: Any = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # Marcado pelo handler para devolver a mensagem ao broker em vez do ack.
+    requeue: bool = False
+
+
+class FairScheduler:
+    """Weighted fair queuing entre owners, com um pool de workers.
+
+    Cada owner tem sua própria fila. A próxima mensagem é a de menor tag
+    de término virtual (1/peso por mensagem), então um owner com muitas
+    mensagens não passa na frente dos demais. Mensagens da mesma conversa
+    nunca rodam em paralelo, preservando a ordem do checkpoint.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[ScheduledMessage], Any],
+        on_done: Optional[Callable[[ScheduledMessage, bool], None]] = None,
+        workers: int = SCHEDULER_WORKERS,
+        max_in_flight_per_owner: int = SCHEDULER_MAX_IN_FLIGHT_PER_OWNER,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.handler = handler
+        self.on_done = on_done
+        self.workers = workers
+        self.max_in_flight_per_owner = max_in_flight_per_owner
+        self.weights = weights if weights is not None else _load_owner_weights()
+
+        self._queues: Dict[str, Deque[tuple]] = {}
+        self._last_tag: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._busy_threads: Set[str] = set()
+        self._owner_in_flight: Dict[str, int] = {}
+        self._queued = 0
+        self._running = False
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._busy_threads)
+
+    def start(self) -> None:
+        with self._condition:
+            self._running = True
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"scheduler-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Para os workers depois que terminarem a mensagem atual."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+    def take_pending(self) -> List[ScheduledMessage]:
+        """Para de distribuir mensagens e devolve as que ainda não começaram.
+
+        As mensagens em execução continuam até terminar; ``in_flight`` diz
+        quantas ainda faltam.
+        """
+        with self._condition:
+            self._running = False
+            pending = [
+                message for queue in self._queues.values() for _, message in queue
+            ]
+            self._queues.clear()
+            self._last_tag.clear()
+            self._queued = 0
+            SCHEDULER_QUEUED.set(0)
+            self._condition.notify_all()
+        return pending
+
+    def submit(self, message: ScheduledMessage) -> None:
+        with self._condition:
+            weight = self.weights.get(message.owner_id, 1.0)
+            start = max(self._virtual_time, self._last_tag.get(message.owner_id, 0.0))
+            tag = start + 1.0 / weight
+            self._last_tag[message.owner_id] = tag
+            self._queues.setdefault(message.owner_id, deque()).append((tag, message))
+            self._queued += 1
+            SCHEDULER_QUEUED.set(self._queued)
+            self._condition.notify()
+
+    def _first_idle(self, queue: Deque[tuple]) -> Optional[int]:
+        """Posição da primeira mensagem do owner cuja conversa está livre.
+
+        As anteriores são de conversas ocupadas, então a ordem de cada
+        conversa se mantém.
+        """
+        for index, (_, message) in enumerate(queue):
+            if message.thread_id not in self._busy_threads:
+                return index
+        return None
+
+    def _next_message(self) -> Optional[ScheduledMessage]:
+        """Escolhe a próxima mensagem elegível; chamado com o lock adquirido."""
+        best_owner, best_index, best_tag = None, None, None
+        for owner_id, queue in self._queues.items():
+            if self._owner_in_flight.get(owner_id, 0) >= self.max_in_flight_per_owner:
+                continue
+            index = self._first_idle(queue)
+            if index is None:
+                continue
+            tag = queue[index][0]
+            if best_tag is None or tag < best_tag:
+                best_owner, best_index, best_tag = owner_id, index, tag
+
+        if best_owner is None:
+            return None
+
+        queue = self._queues[best_owner]
+        tag, message = queue[best_index]
+        del queue[best_index]
+        if not queue:
+            # Owner ocioso volta a competir a partir do tempo virtual atual.
+            del self._queues[best_owner]
+            self._last_tag.pop(best_owner, None)
+
+        self._virtual_time = max(self._virtual_time, tag)
+        self._queued -= 1
+        self._busy_threads.add(message.thread_id)
+        self._owner_in_flight[best_owner] = self._owner_in_flight.get(best_owner, 0) + 1
+        SCHEDULER_QUEUED.set(self._queued)
+        return message
+
+    def _finish(self, message: ScheduledMessage) -> None:
+        with self._condition:
+            self._busy_threads.discard(message.thread_id)
+            remaining = self._owner_in_flight.get(message.owner_id, 1) - 1
+            if remaining > 0:
+                self._owner_in_flight[message.owner_id] = remaining
+            else:
+                self._owner_in_flight.pop(message.owner_id, None)
+            self._condition.notify_all()
+
+    def _worker(self) -> None:
+        while True:
+            with self._condition:
+                message = None
+                while self._running:
+                    message = self._next_message()
+                    if message is not None:
+                        break
+                    self._condition.wait()
+                if message is None:
+                    return
+
+            SCHEDULER_WAIT.observe(time.monotonic() - message.enqueued_at)
+            ok = False
+            try:
+                self.handler(message)
+                ok = True
+            except Exception:
+                logger.exception(
+                    "Erro ao processar mensagem do owner %s", message.owner_id
+                )
+            finally:
+                # on_done antes de liberar a conversa: quando in_flight chega a
+                # zero, os acks já estão agendados e o encerramento os drena.
+                try:
+                    if self.on_done:
+                        self.on_done(message, ok)
+                finally:
+                    self._finish(message)
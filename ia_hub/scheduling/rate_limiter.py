@@ -0,0 +1,107 @@
+"""Limites de taxa por owner (token bucket) para LLM e scraping."""
+
+import os
+import time
+import threading
+from typing import Dict, Optional, Tuple
+
+from ..observability.metrics import registry
+
+RATE_LIMIT_LLM_PER_MINUTE = float(os.getenv("RATE_LIMIT_LLM_PER_MINUTE", "60"))
+RATE_LIMIT_LLM_BURST = float(os.getenv("RATE_LIMIT_LLM_BURST", "10"))
+RATE_LIMIT_SCRAPES_PER_MINUTE = float(os.getenv("RATE_LIMIT_SCRAPES_PER_MINUTE", "6"))
+RATE_LIMIT_SCRAPES_BURST = float(os.getenv("RATE_LIMIT_SCRAPES_BURST", "2"))
+
+RATE_LIMIT_WAIT = registry.histogram(
+    "ia_hub_rate_limit_wait_seconds", "Tempo esperando token no limite por owner."
+)
+RATE_LIMIT_REJECTED = registry.counter(
+    "ia_hub_rate_limit_rejected_total", "Pedidos recusados pelo limite por owner."
+)
+
+
+class TokenBucket:
+    """Token bucket thread-safe: ``rate`` tokens por segundo, até ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Consome um token; se não houver, retorna quantos segundos faltam."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Espera por um token; retorna False se o timeout acabar antes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait == float("inf"):
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class OwnerRateLimiter:
+    """Mantém um token bucket por (recurso, owner_id)."""
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]]):
+        # recurso -> (tokens por minuto, rajada)
+        self.limits = limits
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, resource: str, owner_id: str) -> Optional[TokenBucket]:
+        if resource not in self.limits:
+            return None
+        with self._lock:
+            bucket = self._buckets.get((resource, owner_id))
+            if bucket is None:
+                per_minute, burst = self.limits[resource]
+                bucket = TokenBucket(per_minute / 60.0, burst)
+                self._buckets[(resource, owner_id)] = bucket
+            return bucket
+
+    def acquire(
+        self, resource: str, owner_id: Optional[str], timeout: Optional[float] = None
+    ) -> bool:
+        """Consome um token do owner; sem owner ou sem limite, libera direto."""
+        if not owner_id:
+            return True
+        bucket = self._bucket(resource, owner_id)
+        if bucket is None or bucket.rate <= 0:
+            return True
+
+        started = time.monotonic()
+        acquired = bucket.acquire(timeout)
+        RATE_LIMIT_WAIT.observe(time.monotonic() - started, resource=resource)
+        if not acquired:
+            RATE_LIMIT_REJECTED.inc(resource=resource)
+        return acquired
+
+
+# Instância singleton
+owner_rate_limiter = OwnerRateLimiter(
+    {
+        "llm": (RATE_LIMIT_LLM_PER_MINUTE, RATE_LIMIT_LLM_BURST),
+        "scrape": (RATE_LIMIT_SCRAPES_PER_MINUTE, RATE_LIMIT_SCRAPES_BURST),
+    }
+)
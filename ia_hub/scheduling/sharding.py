@@ -0,0 +1,213 @@
+"""Topologia particionada: conversas roteadas por hash consistente entre réplicas.
+
+O roteador consome a fila de entrada original e republica cada mensagem em
+uma exchange ``x-consistent-hash`` (plugin rabbitmq_consistent_hash_exchange)
+com a routing key ``display_phone_number.wa_id``. Cada réplica do consumer
+liga a própria fila à exchange; o plugin distribui as conversas entre as
+filas ligadas e redistribui só uma fração delas quando uma réplica entra ou
+sai. Assim cada conversa fica presa a um worker, mantendo a ordem por
+thread e a localidade dos caches em memória.
+
+Parar uma réplica (deploy, reinício) não mexe no anel: a fila dela acumula
+as conversas até ela voltar. Só na redução definitiva de réplicas rode
+``python consumer.py --leave-ring`` com o REPLICA_ID que sai, depois que
+ela parou: a fila é desligada e o que restou nela volta para o anel.
+
+Quando uma réplica nova entra, parte das conversas passa para a fila dela,
+mas o que já estava nas filas antigas continua lá. Para a mesma conversa
+não rodar em duas réplicas ao mesmo tempo, a réplica nova liga a fila e só
+começa a consumir depois de ``SHARDING_JOIN_GRACE_SECONDS``, tempo para as
+outras esvaziarem esse acúmulo; as mensagens novas esperam na fila dela, em
+ordem. Um acúmulo maior que a espera ainda pode sobrepor turnos da mesma
+conversa: a deduplicação evita só reprocessar a mesma mensagem.
+"""
+
+import os
+import logging
+
+import pika
+
+logger = logging.getLogger(__name__)
+
+SHARDING_ENABLED = os.getenv("SHARDING_ENABLED", "false").lower() == "true"
+SHARDING_EXCHANGE = os.getenv("SHARDING_EXCHANGE", "incoming.messages.sharded")
+# Obrigatório com o particionamento. Deve ser estável entre reinícios (ex.:
+# nome do pod de um StatefulSet) para que a réplica volte à mesma fila; um id
+# novo a cada reinício deixaria filas órfãs ligadas ao anel.
+REPLICA_ID = os.getenv("REPLICA_ID", "")
+# Peso da réplica no anel (quantidade relativa de conversas).
+SHARDING_REPLICA_WEIGHT = os.getenv("SHARDING_REPLICA_WEIGHT", "1")
+# Espera antes de devolver à fila uma mensagem sem réplica no anel.
+SHARDING_UNROUTABLE_DELAY = float(os.getenv("SHARDING_UNROUTABLE_DELAY", "1"))
+# Espera de uma réplica nova antes de consumir (ver o docstring do módulo).
+SHARDING_JOIN_GRACE_SECONDS = float(os.getenv("SHARDING_JOIN_GRACE_SECONDS", "60"))
+
+
+def replica_queue_name(input_queue: str, replica_id: str = REPLICA_ID) -> str:
+    """Nome da fila exclusiva da réplica."""
+    if not replica_id:
+        raise ValueError(
+            "REPLICA_ID é obrigatório com SHARDING_ENABLED "
+            "(use um id estável, como o nome do pod do StatefulSet)."
+        )
+    return f"{input_queue}.{replica_id}"
+
+
+def declare_exchange(channel) -> None:
+    channel.exchange_declare(
+        exchange=SHARDING_EXCHANGE, exchange_type="x-consistent-hash", durable=True
+    )
+
+
+def _queue_exists(channel, queue: str) -> bool:
+    """Consulta a fila num canal à parte: o 404 do broker fecha o canal."""
+    probe = channel.connection.channel()
+    try:
+        probe.queue_declare(queue=queue, passive=True)
+    except pika.exceptions.ChannelClosedByBroker:
+        return False
+    probe.close()
+    return True
+
+
+def join(
+    channel,
+    input_queue: str,
+    replica_id: str = REPLICA_ID,
+    grace_seconds: float = SHARDING_JOIN_GRACE_SECONDS,
+) -> str:
+    """Declara a fila da réplica e a liga ao anel. Retorna o nome da fila.
+
+    Se a fila ainda não existia, a réplica está entrando no anel agora e a
+    função espera ``grace_seconds`` depois de ligá-la, para as conversas que
+    mudaram de réplica terminarem o que já estava nas filas antigas. Uma
+    réplica que só reiniciou volta à mesma fila e não espera.
+    """
+    declare_exchange(channel)
+    queue = replica_queue_name(input_queue, replica_id)
+    new_member = not _queue_exists(channel, queue)
+    channel.queue_declare(queue=queue, durable=True)
+    channel.queue_bind(
+        queue=queue, exchange=SHARDING_EXCHANGE, routing_key=SHARDING_REPLICA_WEIGHT
+    )
+    logger.info("Réplica %s ligada ao anel com a fila %s", replica_id, queue)
+    if new_member and grace_seconds > 0:
+        logger.info(
+            "Réplica nova: aguardando %.0fs para as outras esvaziarem as "
+            "conversas que mudaram de fila.",
+            grace_seconds,
+        )
+        # connection.sleep mantém os heartbeats enquanto espera.
+        channel.connection.sleep(grace_seconds)
+    return queue
+
+
+def leave(channel, input_queue: str, replica_id: str = REPLICA_ID) -> None:
+    """Tira a réplica do anel; as conversas dela passam para as demais.
+
+    Só para redução definitiva de réplicas (ver ``decommission``); não deve
+    ser chamado num encerramento comum.
+    """
+    queue = replica_queue_name(input_queue, replica_id)
+    channel.queue_unbind(
+        queue=queue, exchange=SHARDING_EXCHANGE, routing_key=SHARDING_REPLICA_WEIGHT
+    )
+    logger.info("Réplica %s removida do anel", replica_id)
+
+
+def _forward(channel, routing_key: str, body, properties) -> bool:
+    """Publica na exchange particionada; False se nenhuma fila recebeu.
+
+    Com ``mandatory`` e confirmações, uma mensagem sem fila ligada volta
+    como UnroutableError em vez de ser confirmada e descartada.
+    """
+    try:
+        channel.basic_publish(
+            exchange=SHARDING_EXCHANGE,
+            routing_key=routing_key,
+            body=body,
+            properties=properties or pika.BasicProperties(delivery_mode=2),
+            mandatory=True,
+        )
+        return True
+    except (pika.exceptions.UnroutableError, pika.exceptions.NackError) as e:
+        logger.warning("Mensagem não roteada para nenhuma réplica: %r", e)
+        return False
+
+
+def _routing_key(routing_key_of, body, fallback: str) -> str:
+    try:
+        return routing_key_of(body)
+    except Exception:
+        logger.exception("Mensagem sem chave de conversa; roteando por delivery.")
+        return fallback
+
+
+def decommission(
+    connection, input_queue: str, routing_key_of, replica_id: str = REPLICA_ID
+) -> int:
+    """Remove de vez a réplica do anel e devolve a fila dela para as demais.
+
+    Rodar depois que a réplica parou de consumir. Retorna quantas mensagens
+    foram redistribuídas; a fila só é apagada se ficar vazia.
+    """
+    channel = connection.channel()
+    channel.confirm_delivery()
+    leave(channel, input_queue, replica_id)
+
+    queue = replica_queue_name(input_queue, replica_id)
+    moved = 0
+    while True:
+        method, properties, body = channel.basic_get(queue=queue)
+        if method is None:
+            break
+        routing_key = _routing_key(routing_key_of, body, str(method.delivery_tag))
+        if not _forward(channel, routing_key, body, properties):
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            raise RuntimeError("Nenhuma outra réplica no anel para receber a fila.")
+        channel.basic_ack(delivery_tag=method.delivery_tag)
+        moved += 1
+
+    channel.queue_delete(queue=queue, if_empty=True)
+    logger.info(
+        "Réplica %s desativada; %d mensagem(ns) redistribuída(s).", replica_id, moved
+    )
+    return moved
+
+
+def run_router(connection, input_queue: str, routing_key_of) -> None:
+    """Move as mensagens da fila de entrada para a exchange particionada.
+
+    Args:
+        connection: Conexão pika bloqueante.
+        input_queue: Fila onde o webhook publica as mensagens.
+        routing_key_of: Função payload -> chave da conversa.
+    """
+    channel = connection.channel()
+    channel.queue_declare(queue=input_queue, durable=True)
+    declare_exchange(channel)
+    channel.confirm_delivery()
+    channel.basic_qos(prefetch_count=100)
+
+    def on_message(ch, method, properties, body):
+        routing_key = _routing_key(routing_key_of, body, str(method.delivery_tag))
+        # Com confirm_delivery o publish só retorna depois do broker confirmar.
+        if _forward(ch, routing_key, body, properties):
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+            return
+
+        # Sem réplica no anel: a mensagem volta para a entrada, com uma pausa
+        # para não girar em falso enquanto nenhuma fila está ligada.
+        connection.sleep(SHARDING_UNROUTABLE_DELAY)
+        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+
+    channel.basic_consume(queue=input_queue, on_message_callback=on_message)
+    logger.info(
+        "Roteador encaminhando '%s' para a exchange '%s'...",
+        input_queue,
+        SHARDING_EXCHANGE,
+    )
+    try:
+        channel.start_consuming()
+    except KeyboardInterrupt:
+        channel.stop_consuming()
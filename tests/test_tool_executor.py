@@ -0,0 +1,52 @@
+"""Testes do corte de saídas no executor paralelo de ferramentas."""
+
+import pytest
+
+pytest.importorskip("langgraph.prebuilt")
+pytest.importorskip("psycopg2")
+
+from langchain_core.messages import ToolMessage  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+
+from ia_hub.agents.tool_executor import ParallelToolNode  # noqa: E402
+from ia_hub.agents.tool_outputs import (  # noqa: E402
+    AVAILABILITY_TOOL,
+    CHARS_PER_TOKEN,
+    get_budget,
+)
+
+
+@tool
+def verbose_tool(query: str) -> str:
+    """Devolve um texto bem maior que o orçamento."""
+    return "x" * 10_000
+
+
+@tool(AVAILABILITY_TOOL)
+def self_budgeted_tool(query: str) -> str:
+    """Ferramenta que já respeita o próprio orçamento."""
+    return "y" * 10_000
+
+
+def _call(name: str) -> dict:
+    return {"name": name, "args": {"query": "q"}, "id": "call-1"}
+
+
+def test_over_budget_output_is_trimmed():
+    node = ParallelToolNode([verbose_tool])
+
+    output = node._run_timed(_call("verbose_tool"), {})
+
+    assert isinstance(output, ToolMessage)
+    assert len(output.content) == get_budget("verbose_tool") * CHARS_PER_TOKEN
+    assert output.content.endswith("…")
+    assert output.tool_call_id == "call-1"
+    assert output.status == "success"
+
+
+def test_self_budgeted_output_is_kept():
+    node = ParallelToolNode([self_budgeted_tool])
+
+    output = node._run_timed(_call(AVAILABILITY_TOOL), {})
+
+    assert output.content == "y" * 10_000